@@ -2,9 +2,21 @@
 Backend configuration management with deployment-safe defaults
 """
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
+
+def _parse_bool(env: str, default: str) -> bool:
+    """Read a boolean feature flag from the environment"""
+    return os.getenv(env, default).casefold() == "true"
+
+
+def _parse_list(env: str, default: str) -> List[str]:
+    """Read a comma-separated list from the environment, dropping blank entries"""
+    return [item.strip() for item in os.getenv(env, default).split(",") if item.strip()]
+
+
 class Config:
     """Configuration class with environment variable support"""
     
@@ -14,22 +26,41 @@ class Config:
     # Server settings
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    WORKERS: int = int(os.getenv("WORKERS", "1"))  # Each worker loads its own copy of the model
+    ACCESS_LOG: bool = _parse_bool("ACCESS_LOG", "false")  # Handlers already log each request
     
     # Model settings
     MODEL_PATH: str = os.getenv("MODEL_PATH", "./yolov5su.pt")
     MODEL_CONFIDENCE_THRESHOLD: float = float(os.getenv("MODEL_CONFIDENCE_THRESHOLD", "0.5"))
     MAX_UPLOAD_SIZE_MB: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10"))
     
+    # Inference batching: max images per forward pass and how long to wait for stragglers
+    INFERENCE_BATCH_MAX: int = int(os.getenv("INFERENCE_BATCH_MAX", "8"))
+    INFERENCE_BATCH_WAIT_MS: float = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
+    EXPORT_MODEL: bool = _parse_bool("EXPORT_MODEL", "true")  # TensorRT/ONNX export at startup
+    COMPILE_MODEL: bool = _parse_bool("COMPILE_MODEL", "false")  # torch.compile when no export is in use
+    MODEL_PRECISION: str = os.getenv("MODEL_PRECISION", "fp16").lower()  # GPU: fp16, or fp32 for full accuracy
+    CPU_INT8: bool = _parse_bool("CPU_INT8", "false")  # CPU hosts: OpenVINO INT8 export instead of ONNX FP32
+    INT8_CALIBRATION_DATA: str = os.getenv("INT8_CALIBRATION_DATA", "coco128.yaml")  # Ultralytics dataset YAML
+    
     # CORS settings
-    CORS_ORIGINS: List[str] = os.getenv(
+    # Default origins: local dev + Vercel frontend
+    CORS_ORIGINS: List[str] = _parse_list(
         "CORS_ORIGINS",
-        "http://localhost:3000,http://localhost:8080"
-    ).split(",")
+        "http://localhost:8080,http://localhost:3000,http://localhost:8081,https://access-atlas.vercel.app"
+    )
+    # Also allow origins matching CORS_ORIGIN_REGEX (covers Vercel preview deployments)
+    ALLOW_VERCEL_ORIGINS: bool = _parse_bool("ALLOW_VERCEL_ORIGINS", "true")
+    CORS_ORIGIN_REGEX: str = os.getenv(
+        "CORS_ORIGIN_REGEX",
+        r"^https://([a-z0-9-]+\.)?vercel\.app$|^http://localhost:\d+$"
+    )
+    CORS_MAX_AGE: int = int(os.getenv("CORS_MAX_AGE", "86400"))  # Seconds browsers may cache preflights
     
     # Feature flags
-    ENABLE_TTS: bool = os.getenv("ENABLE_TTS", "true").lower() == "true"
-    ENABLE_VOICE_FEEDBACK: bool = os.getenv("ENABLE_VOICE_FEEDBACK", "true").lower() == "true"
-    FALLBACK_MODE: bool = os.getenv("FALLBACK_MODE", "false").lower() == "true"
+    ENABLE_TTS: bool = _parse_bool("ENABLE_TTS", "true")
+    ENABLE_VOICE_FEEDBACK: bool = _parse_bool("ENABLE_VOICE_FEEDBACK", "true")
+    FALLBACK_MODE: bool = _parse_bool("FALLBACK_MODE", "false")
     
     # Platform detection
     PLATFORM: str = os.getenv("PLATFORM", "local")
@@ -37,6 +68,9 @@ class Config:
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # Re-validate /api/tags read responses against their schemas (debugging aid)
+    VALIDATE_API_RESPONSE: bool = _parse_bool("VALIDATE_API_RESPONSE", "false")
+    
     @classmethod
     def get_model_path(cls) -> Path:
         """
@@ -46,65 +80,94 @@ class Config:
         1. Absolute path from environment variable
         2. Relative to backend directory
         3. Relative to current working directory
-        """
-        model_path = Path(cls.MODEL_PATH)
         
-        # If absolute path exists, use it
-        if model_path.is_absolute() and model_path.exists():
-            return model_path
-        
-        # Try relative to BASE_DIR (backend/)
-        relative_to_base = cls.BASE_DIR / cls.MODEL_PATH
-        if relative_to_base.exists():
-            return relative_to_base
-        
-        # Try relative to current working directory
-        relative_to_cwd = Path.cwd() / cls.MODEL_PATH
-        if relative_to_cwd.exists():
-            return relative_to_cwd
-        
-        # If nothing found, raise error with helpful message
-        raise FileNotFoundError(
-            f"Model file not found at: {cls.MODEL_PATH}\n"
-            f"Searched locations:\n"
-            f"  1. {model_path}\n"
-            f"  2. {relative_to_base}\n"
-            f"  3. {relative_to_cwd}\n"
-            f"Please ensure yolov5su.pt is present or set MODEL_PATH environment variable."
-        )
+        The resolved path is memoized, so repeated calls do not re-probe the filesystem.
+        """
+        return _resolve_model_path(cls.MODEL_PATH, cls.BASE_DIR)
     
     @classmethod
     def validate(cls) -> dict:
-        """Validate configuration and return status"""
-        status = {
-            "valid": True,
-            "warnings": [],
-            "errors": []
+        """Validate configuration and return status (cached per model/platform/TTS setting)"""
+        status = _validate_config(cls.MODEL_PATH, cls.BASE_DIR, cls.PLATFORM, cls.ENABLE_TTS)
+        # Hand out a copy so callers can't mutate the cached result
+        return {
+            "valid": status["valid"],
+            "warnings": list(status["warnings"]),
+            "errors": list(status["errors"])
         }
-        
-        # Check model file
+    
+    @classmethod
+    def cache_clear(cls) -> None:
+        """Drop memoized model path and validation results (e.g. in tests or after changing MODEL_PATH)"""
+        _resolve_model_path.cache_clear()
+        _validate_config.cache_clear()
+
+
+@lru_cache(maxsize=4)
+def _resolve_model_path(model_path_str: str, base_dir: Path) -> Path:
+    """Resolve the model file location; see Config.get_model_path for the search order"""
+    model_path = Path(model_path_str)
+    relative_to_base = base_dir / model_path_str
+    
+    # Candidates are probed lazily so a BASE_DIR hit never pays for getcwd()
+    def candidates():
+        if model_path.is_absolute():
+            yield model_path
+        yield relative_to_base
+        yield Path.cwd() / model_path_str
+    
+    for candidate in candidates():
         try:
-            model_path = cls.get_model_path()
-            model_size_mb = model_path.stat().st_size / (1024 * 1024)
-            
-            if model_size_mb > 100:
-                status["warnings"].append(
-                    f"Model file is {model_size_mb:.1f}MB. "
-                    f"Some platforms (e.g., Render free tier) have 100MB limit. "
-                    f"Consider using smaller model (yolov5n.pt or yolov5s.pt)."
-                )
-        except FileNotFoundError as e:
-            status["valid"] = False
-            status["errors"].append(str(e))
+            os.stat(candidate)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        return candidate
+    
+    relative_to_cwd = Path.cwd() / model_path_str
+    
+    # If nothing found, raise error with helpful message
+    raise FileNotFoundError(
+        f"Model file not found at: {model_path_str}\n"
+        f"Searched locations:\n"
+        f"  1. {model_path}\n"
+        f"  2. {relative_to_base}\n"
+        f"  3. {relative_to_cwd}\n"
+        f"Please ensure yolov5su.pt is present or set MODEL_PATH environment variable."
+    )
+
+
+@lru_cache(maxsize=1)
+def _validate_config(model_path_str: str, base_dir: Path, platform: str, enable_tts: bool) -> dict:
+    """Build the validation status for Config.validate"""
+    status = {
+        "valid": True,
+        "warnings": [],
+        "errors": []
+    }
+    
+    # Check model file
+    try:
+        model_path = _resolve_model_path(model_path_str, base_dir)
+        model_size_mb = model_path.stat().st_size / (1024 * 1024)
         
-        # Check platform-specific requirements
-        if cls.PLATFORM == "render" and cls.ENABLE_TTS:
+        if model_size_mb > 100:
             status["warnings"].append(
-                "TTS (pyttsx3) may not work on Render due to system dependencies. "
-                "Set ENABLE_TTS=false for Render deployment."
+                f"Model file is {model_size_mb:.1f}MB. "
+                f"Some platforms (e.g., Render free tier) have 100MB limit. "
+                f"Consider using smaller model (yolov5n.pt or yolov5s.pt)."
             )
-        
-        return status
+    except FileNotFoundError as e:
+        status["valid"] = False
+        status["errors"].append(str(e))
+    
+    # Check platform-specific requirements
+    if platform == "render" and enable_tts:
+        status["warnings"].append(
+            "TTS (pyttsx3) may not work on Render due to system dependencies. "
+            "Set ENABLE_TTS=false for Render deployment."
+        )
+    
+    return status
 
 # Global config instance
 config = Config()
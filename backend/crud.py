@@ -2,21 +2,63 @@
 CRUD operations for accessibility tags
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import Row, and_, delete, func, insert, select
 from typing import List, Dict, Optional
+from collections import defaultdict
 import logging
-from models import AccessibilityTag, TagSource
-from schemas import TagCreate, TagResponse
+import math
+import threading
+import time
+from models import AccessibilityTag, TagSource, TagType
+from schemas import TagCreate
 
 logger = logging.getLogger(__name__)
 
+# Approximate length of one degree of latitude
+KM_PER_DEGREE = 111.0
+
+# Page size for get_tags_by_location - bounds rows materialized per request
+DEFAULT_TAG_LIMIT = 500
+
+# Whole-table aggregates (locations, statistics) are cached briefly; every
+# write in this module drops the cache. Other worker processes may serve a
+# stale aggregate for up to the TTL.
+AGGREGATE_CACHE_TTL_SECONDS = 30
+_aggregate_cache: Dict[str, tuple] = {}  # key -> (expires_at, value)
+_aggregate_cache_lock = threading.Lock()
+_aggregate_generation = 0  # Bumped on every write, so in-flight results computed before it are not cached
+
+
+def cached_aggregate(key: str, compute):
+    """Return the cached value for key, computing and storing it on a miss or expiry"""
+    with _aggregate_cache_lock:
+        entry = _aggregate_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        generation = _aggregate_generation
+    
+    value = compute()
+    with _aggregate_cache_lock:
+        if generation == _aggregate_generation:
+            _aggregate_cache[key] = (time.monotonic() + AGGREGATE_CACHE_TTL_SECONDS, value)
+    return value
+
+
+def invalidate_aggregates():
+    """Drop cached aggregates after tags were added or removed"""
+    global _aggregate_generation
+    with _aggregate_cache_lock:
+        _aggregate_generation += 1
+        _aggregate_cache.clear()
+
+
 def create_tags(
     db: Session,
     location_name: str,
     location_lat: float,
     location_lon: float,
     tags: List[TagCreate]
-) -> List[AccessibilityTag]:
+) -> List[int]:
     """
     Create multiple accessibility tags for a location
     
@@ -28,86 +70,163 @@ def create_tags(
         tags: List of tags to create
     
     Returns:
-        List of created AccessibilityTag objects
+        IDs of the created tags
     """
-    created_tags = []
+    rows = [
+        {
+            "location_name": location_name,
+            "lat": tag_data.lat,
+            "lon": tag_data.lon,
+            "tag_type": tag_data.type.value,
+            "source": tag_data.source.value,
+            "address": tag_data.address,
+            "confidence": tag_data.confidence,
+            "osm_id": tag_data.osm_id,
+            "notes": tag_data.notes
+        }
+        for tag_data in tags
+    ]
     
     try:
-        for tag_data in tags:
-            db_tag = AccessibilityTag(
-                location_name=location_name,
-                lat=tag_data.lat,
-                lon=tag_data.lon,
-                tag_type=tag_data.type.value,
-                source=tag_data.source.value,
-                address=tag_data.address,
-                confidence=tag_data.confidence,
-                osm_id=tag_data.osm_id,
-                notes=tag_data.notes
-            )
-            db.add(db_tag)
-            created_tags.append(db_tag)
-        
+        # Single multi-row INSERT ... RETURNING id; returning plain IDs rather
+        # than ORM objects means nothing is expired on commit and reloaded per tag
+        tag_ids = list(db.scalars(
+            insert(AccessibilityTag).returning(AccessibilityTag.id),
+            rows
+        ))
         db.commit()
+        invalidate_aggregates()
         
-        # Refresh to get IDs and timestamps
-        for tag in created_tags:
-            db.refresh(tag)
-        
-        logger.info(f"Created {len(created_tags)} tags for location: {location_name}")
-        return created_tags
+        logger.info(f"Created {len(tag_ids)} tags for location: {location_name}")
+        return tag_ids
     
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating tags: {str(e)}")
         raise
 
+def detection_tag_rows(
+    location_name: str,
+    lat: float,
+    lon: float,
+    detections: List[Dict]
+) -> List[Dict]:
+    """
+    Build insert rows for YOLO detections at one location
+    
+    Detected objects (people, chairs, bottles, ...) are not accessibility
+    features themselves, so they are stored as obstacles with the label
+    and position kept in notes.
+    
+    Args:
+        location_name: Name of the location
+        lat: Latitude where the image was taken
+        lon: Longitude where the image was taken
+        detections: {"label", "confidence", "position"} dicts from /detect
+    
+    Returns:
+        Row dicts for insert_tag_rows
+    """
+    return [
+        {
+            "location_name": location_name,
+            "lat": lat,
+            "lon": lon,
+            "tag_type": TagType.obstacle,
+            "source": TagSource.model,
+            "confidence": detection["confidence"],
+            "notes": f"{detection['label']} {detection['position']}"
+        }
+        for detection in detections
+    ]
+
+def insert_tag_rows(db: Session, rows: List[Dict]) -> int:
+    """
+    Insert tag rows with a single executemany INSERT and one commit
+    
+    Args:
+        db: Database session
+        rows: Column-name -> value dicts (see detection_tag_rows)
+    
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    
+    try:
+        db.execute(insert(AccessibilityTag), rows)
+        db.commit()
+        invalidate_aggregates()
+        return len(rows)
+    
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error inserting tags: {str(e)}")
+        raise
+
 def get_tags_by_location(
     db: Session,
     location_name: str,
     radius_km: Optional[float] = None,
     lat: Optional[float] = None,
-    lon: Optional[float] = None
-) -> Dict[str, List[AccessibilityTag]]:
+    lon: Optional[float] = None,
+    limit: int = DEFAULT_TAG_LIMIT,
+    offset: int = 0
+) -> Dict[str, List[Row]]:
     """
     Get all tags for a location, grouped by source
     
+    Rows are plain column tuples (attribute access like tag.lat still
+    works) rather than ORM instances, so reads skip identity-map and
+    instance-state bookkeeping for every tag.
+    
     Args:
         db: Database session
         location_name: Name of the location
         radius_km: Optional radius in km for proximity search
         lat: Optional center latitude for proximity search
         lon: Optional center longitude for proximity search
+        limit: Maximum number of tags to return (newest first)
+        offset: Number of tags to skip, for paging
     
     Returns:
-        Dictionary with tags grouped by source (user, osm, model)
+        Dictionary with tag rows grouped by source (user, osm, model)
     """
     try:
-        query = db.query(AccessibilityTag)
+        query = db.query(*AccessibilityTag.__table__.columns)
         
         if radius_km and lat and lon:
-            # Haversine formula for distance calculation
-            # Simplified: 1 degree ≈ 111km at equator
-            degree_radius = radius_km / 111.0
+            # Equirectangular approximation: 1 degree of latitude ≈ 111km,
+            # longitude degrees shrink by cos(lat) away from the equator
+            lat_radius = radius_km / KM_PER_DEGREE
+            lon_scale = max(math.cos(math.radians(lat)), 1e-6)
+            lon_radius = lat_radius / lon_scale
+            
+            # Bounding box prefilter (index seek on lat/lon), then the exact
+            # distance check on the remaining rows - evaluated in SQL
+            d_lat = AccessibilityTag.lat - lat
+            d_lon = (AccessibilityTag.lon - lon) * lon_scale
             query = query.filter(
                 and_(
-                    AccessibilityTag.lat.between(lat - degree_radius, lat + degree_radius),
-                    AccessibilityTag.lon.between(lon - degree_radius, lon + degree_radius)
+                    AccessibilityTag.lat.between(lat - lat_radius, lat + lat_radius),
+                    AccessibilityTag.lon.between(lon - lon_radius, lon + lon_radius),
+                    d_lat * d_lat + d_lon * d_lon <= lat_radius * lat_radius
                 )
             )
         else:
             # Exact location name match
             query = query.filter(AccessibilityTag.location_name == location_name)
         
-        all_tags = query.order_by(AccessibilityTag.created_at.desc()).all()
-        
-        # Group by source
-        grouped = {
-            TagSource.user.value: [],
-            TagSource.osm.value: [],
-            TagSource.model.value: []
-        }
+        all_tags = (
+            query.order_by(AccessibilityTag.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
         
+        # Group by source; sources with no tags come back as empty lists
+        grouped = defaultdict(list)
         for tag in all_tags:
             grouped[tag.source.value].append(tag)
         
@@ -122,33 +241,31 @@ def get_all_locations(db: Session) -> List[Dict]:
     """
     Get all unique locations with tag counts
     
+    Cached for AGGREGATE_CACHE_TTL_SECONDS (see cached_aggregate).
+    
     Returns:
-        List of dictionaries with location info
+        List of dicts with location info (shared cache entries - don't mutate)
     """
-    try:
-        results = db.query(
-            AccessibilityTag.location_name,
-            AccessibilityTag.lat,
-            AccessibilityTag.lon,
-            func.count(AccessibilityTag.id).label('tag_count')
-        ).group_by(
-            AccessibilityTag.location_name,
-            AccessibilityTag.lat,
-            AccessibilityTag.lon
-        ).all()
-        
-        locations = [
-            {
-                "location_name": r.location_name,
-                "lat": r.lat,
-                "lon": r.lon,
-                "tag_count": r.tag_count
-            }
-            for r in results
-        ]
+    def load():
+        # mappings() yields dict-like rows keyed by column label directly
+        locations = db.execute(
+            select(
+                AccessibilityTag.location_name,
+                AccessibilityTag.lat,
+                AccessibilityTag.lon,
+                func.count(AccessibilityTag.id).label('tag_count')
+            ).group_by(
+                AccessibilityTag.location_name,
+                AccessibilityTag.lat,
+                AccessibilityTag.lon
+            )
+        ).mappings().all()
         
         logger.info(f"Retrieved {len(locations)} unique locations")
-        return locations
+        return [dict(location) for location in locations]
+    
+    try:
+        return cached_aggregate("locations", load)
     
     except Exception as e:
         logger.error(f"Error retrieving locations: {str(e)}")
@@ -166,10 +283,11 @@ def delete_tag(db: Session, tag_id: int) -> bool:
         True if deleted, False if not found
     """
     try:
-        tag = db.query(AccessibilityTag).filter(AccessibilityTag.id == tag_id).first()
-        if tag:
-            db.delete(tag)
-            db.commit()
+        # Single DELETE; rowcount tells us whether the tag existed
+        result = db.execute(delete(AccessibilityTag).where(AccessibilityTag.id == tag_id))
+        db.commit()
+        if result.rowcount > 0:
+            invalidate_aggregates()
             logger.info(f"Deleted tag with ID: {tag_id}")
             return True
         return False
@@ -183,31 +301,39 @@ def get_tag_statistics(db: Session) -> Dict:
     """
     Get overall statistics about tags
     
+    Cached for AGGREGATE_CACHE_TTL_SECONDS (see cached_aggregate).
+    
     Returns:
-        Dictionary with statistics
+        Dictionary with statistics (a shared cache entry - don't mutate)
     """
-    try:
-        total_tags = db.query(func.count(AccessibilityTag.id)).scalar()
-        
-        by_source = db.query(
+    def load():
+        # One grouped scan; totals per source/type are folded in Python
+        pairs = db.query(
             AccessibilityTag.source,
-            func.count(AccessibilityTag.id)
-        ).group_by(AccessibilityTag.source).all()
-        
-        by_type = db.query(
             AccessibilityTag.tag_type,
             func.count(AccessibilityTag.id)
-        ).group_by(AccessibilityTag.tag_type).all()
+        ).group_by(AccessibilityTag.source, AccessibilityTag.tag_type).all()
+        
+        total_tags = 0
+        by_source: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        for source, tag_type, count in pairs:
+            total_tags += count
+            by_source[str(source)] = by_source.get(str(source), 0) + count
+            by_type[str(tag_type)] = by_type.get(str(tag_type), 0) + count
         
         stats = {
             "total_tags": total_tags,
-            "by_source": {str(source): count for source, count in by_source},
-            "by_type": {str(tag_type): count for tag_type, count in by_type}
+            "by_source": by_source,
+            "by_type": by_type
         }
         
         logger.info(f"Generated statistics: {stats}")
         return stats
     
+    try:
+        return cached_aggregate("statistics", load)
+    
     except Exception as e:
         logger.error(f"Error generating statistics: {str(e)}")
         raise
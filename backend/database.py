@@ -1,7 +1,8 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,12 +10,43 @@ import os
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./accessibility_tags.db")
 
+IS_SQLITE = "sqlite" in DATABASE_URL
+
 # Create engine
 # For SQLite: check_same_thread=False allows FastAPI to work with SQLite
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# For server databases: keep a warm connection pool and drop stale connections
+if IS_SQLITE:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    engine_options = {}
+    if make_url(DATABASE_URL).get_driver_name() == "psycopg2":
+        # Multi-row VALUES for INSERT plus execute_batch for UPDATE/DELETE
+        # executemany, so bulk writes take one round trip per page
+        engine_options["executemany_mode"] = "values_plus_batch"
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        **engine_options
+    )
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Tune each new SQLite connection
+        WAL lets /detect auto-save writes proceed without blocking tag reads
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -38,4 +70,14 @@ def init_db():
     Initialize database tables
     Call this on app startup
     """
+    # Register the models on Base.metadata, also when called from a process
+    # that hasn't imported them yet (e.g. the gunicorn master)
+    import models  # noqa: F401
+    
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so make sure indexes added
+    # after a database was first created are present as well
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for production deployments
+
+Runs several Uvicorn worker processes so CPU-bound request work (image
+decoding, EXIF parsing, NumPy post-processing) uses more than one core.
+
+Usage:
+    gunicorn main:app -c gunicorn.conf.py
+
+Each worker loads its own model in the FastAPI lifespan handler. --preload
+is deliberately not used: loading weights (and initializing CUDA) before
+fork is unsafe on GPU hosts, and inference is already serialized per
+process by the batched inference worker.
+"""
+
+from config import config
+from database import init_db
+
+bind = f"{config.HOST}:{config.PORT}"
+workers = config.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Model loading (and a first-time TensorRT/ONNX export) blocks worker boot
+timeout = 300
+keepalive = 5
+accesslog = "-" if config.ACCESS_LOG else None
+
+
+def on_starting(server):
+    """
+    Create the schema in the master before any worker forks
+    
+    Each worker's lifespan still calls init_db(); with the tables and
+    indexes already present those calls are existence checks, not
+    concurrent first-time creates.
+    """
+    init_db()
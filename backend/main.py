@@ -1,11 +1,23 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, FileResponse, Response
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
+import concurrent.futures
 import time
 import logging
 import os
 import uuid
+import hashlib
+import importlib.util
+import io
+import queue
+import struct
 import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
 # Configure logging with better formatting
@@ -16,44 +28,136 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database, model, TTS worker and audio cleanup on startup; release them on shutdown"""
+    global model
+    
+    logger.info("Initializing database...")
+    init_db()
+    logger.info("✓ Database initialized successfully")
+    
+    load_model()
+    invalidate_status_cache()
+    if model is not None:
+        # Switching back to the startup model reuses it (export/compile and
+        # MODEL_PATH included) instead of reloading "<name>.pt" from the cwd
+        _model_cache[config.get_model_path().stem] = (model, _labels)
+        start_inference_worker()
+    app.state.detect_impl = resolve_detect_impl()
+    
+    if _HAS_FULL_STACK and _HAS_TTS:
+        _ensure_speech_worker()
+    
+    audio_cleanup = asyncio.create_task(audio_cleanup_loop()) if _HAS_TTS else None
+    
+    yield
+    
+    if audio_cleanup is not None:
+        audio_cleanup.cancel()
+    app.state.detect_impl = _detect_mock
+    stop_inference_worker()
+    model = None
+    _model_cache.clear()
+    invalidate_status_cache()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="AccessAtlas Backend",
     description="YOLOv5 Object Detection API with Voice Feedback and Tag Storage",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson serializes detection payloads much faster than stdlib json
 )
 
-# Import database initialization
-from database import init_db
+# Import configuration and database initialization
+from config import config
+from database import init_db, SessionLocal
+from crud import detection_tag_rows, insert_tag_rows
 from tags_api import router as tags_router
 
 # Include tags router
 app.include_router(tags_router)
 
-# CORS configuration - support local development and Vercel deployment
-CORS_ORIGINS = os.getenv(
-    "CORS_ORIGINS",
-    # Default origins: local dev + Vercel frontend
-    "http://localhost:8080,http://localhost:3000,http://localhost:8081,https://access-atlas.vercel.app"
-).split(",")
+# Upload limits - MAX_FILE_SIZE (bytes) overrides MAX_UPLOAD_SIZE_MB from config
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", config.MAX_UPLOAD_SIZE_MB * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # Slack for multipart boundaries/headers in Content-Length
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.webp'})
+UPLOAD_PATHS = frozenset({"/detect"})  # Routes whose body is a single image upload
+
+
+def upload_size_limit(app, limit: int, paths: frozenset):
+    """
+    ASGI middleware rejecting oversized uploads from Content-Length alone
+    
+    FastAPI reads and parses the whole multipart body (spooling it to disk)
+    before the endpoint runs, so a size check inside detect() comes too late
+    to save that work. This answers 413 before any of the body is received.
+    Bodies without a Content-Length are still capped by read_upload_limited.
+    """
+    async def middleware(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in paths:
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > limit:
+                        response = ORJSONResponse(
+                            {"detail": f"File too large. Max size: {MAX_FILE_SIZE / 1024 / 1024}MB"},
+                            status_code=413
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await app(scope, receive, send)
+    
+    return middleware
+
 
-# Add support for all Vercel preview deployments
-ALLOW_ALL_VERCEL = os.getenv("ALLOW_VERCEL_ORIGINS", "true").lower() == "true"
+# Added before CORS so CORS stays outermost and 413s still carry CORS headers
+app.add_middleware(upload_size_limit, limit=MAX_FILE_SIZE + MULTIPART_OVERHEAD, paths=UPLOAD_PATHS)
 
+# CORS configuration - support local development and Vercel deployment (parsed once in config)
+# Exact origins come from CORS_ORIGINS; Vercel previews and localhost ports match a
+# regex Starlette compiles once. max_age lets browsers reuse preflights for a day.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=CORS_ORIGINS if not ALLOW_ALL_VERCEL else ["*"],  # Allow all origins if ALLOW_VERCEL_ORIGINS is true
+    allow_origins=config.CORS_ORIGINS,
+    allow_origin_regex=config.CORS_ORIGIN_REGEX if config.ALLOW_VERCEL_ORIGINS else None,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
     expose_headers=["*"],
+    max_age=config.CORS_MAX_AGE,
 )
 
+# Local VizWiz images used by /detect/batch
+DATASET_DIR = Path(__file__).parent.parent / "archive" / "vizwiz_data_ver1" / "data" / "Images"
+
+# Detection threshold - CONFIDENCE_THRESHOLD overrides MODEL_CONFIDENCE_THRESHOLD from config
+CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", config.MODEL_CONFIDENCE_THRESHOLD))
+
 
 # Try to import heavy ML and TTS libraries with better error handling
 _HAS_FULL_STACK = True
 _HAS_TTS = False
 model = None
+_labels = None  # Class-id indexed label table for the loaded model
+_model_lock = threading.Lock()  # Swaps model and _labels together (see publish_model)
+CUDA_AVAILABLE = False
+USE_FP16 = False  # Half-precision GPU inference (MODEL_PRECISION=fp16 on CUDA hosts)
+_HAS_GPU_DECODE = False  # nvJPEG decode via torchvision on CUDA hosts
+JPEG_MAGIC = b"\xff\xd8\xff"
+LETTERBOX_FILL = 114 / 255  # Padding grey of Ultralytics' letterbox, for GPU-letterboxed JPEGs
+_turbo_jpeg = None  # PyTurboJPEG decoder, if libjpeg-turbo is installed
+_PREDICT_KWARGS: dict = {}  # Extra model(...) kwargs for the active device
+WARMUP_RUNS = 2  # Dummy inferences run after loading a model
+MODEL_IMGSZ = 640  # Model input size: baked into exports, floor for scaled JPEG decode
+
+# Persist torch.compile kernels across restarts so only the first boot pays
+# for compilation (must be set before torch is imported)
+if config.COMPILE_MODEL:
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(config.BASE_DIR / ".inductor_cache"))
 
 try:
     import numpy as np  # type: ignore
@@ -61,12 +165,47 @@ try:
     from PIL import Image  # type: ignore
     from PIL.ExifTags import TAGS, GPSTAGS  # type: ignore
     import piexif  # type: ignore
-    import io
-    import threading
+    import cv2  # type: ignore  # installed with ultralytics
     import torch  # type: ignore
     
     logger.info(f"ML stack loaded - PyTorch {torch.__version__}, NumPy {np.__version__}")
     
+    # On GPU: FP16 inference on device 0 (unless MODEL_PRECISION=fp32),
+    # TF32 matmuls and cuDNN autotuning
+    CUDA_AVAILABLE = torch.cuda.is_available()
+    if CUDA_AVAILABLE:
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
+        USE_FP16 = config.MODEL_PRECISION != "fp32"
+        _PREDICT_KWARGS = {"half": USE_FP16, "device": 0}
+        logger.info(
+            f"CUDA available ({torch.cuda.get_device_name(0)}) - "
+            f"using {'FP16' if USE_FP16 else 'FP32'} inference"
+        )
+        
+        try:
+            from torchvision.io import decode_jpeg, ImageReadMode  # type: ignore
+            _HAS_GPU_DECODE = True
+        except ImportError:
+            logger.warning("torchvision not available - JPEGs will be decoded on CPU")
+    
+    # Optional libjpeg-turbo decoder for the CPU JPEG path
+    try:
+        from turbojpeg import TurboJPEG, TJPF_BGR  # type: ignore
+        _turbo_jpeg = TurboJPEG()
+        logger.info("TurboJPEG available - fast CPU JPEG decode")
+    except Exception as e:
+        logger.info(f"TurboJPEG not available ({e}) - using cv2 for JPEG decode")
+    
+    # cv2 flags for libjpeg DCT-domain downscaled decode, by scale denominator
+    JPEG_REDUCED_FLAGS = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }
+    
     # Optional TTS - try gTTS first (better for web), fallback to pyttsx3
     try:
         from gtts import gTTS  # type: ignore
@@ -84,40 +223,6 @@ try:
             _HAS_TTS = False
             _TTS_ENGINE = None
 
-    logger.info("Attempting to load YOLOv5 model...")
-    
-    # Find model file with multiple fallback locations
-    MODEL_PATH = os.getenv("MODEL_PATH", "yolov5su.pt")
-    model_locations = [
-        Path(MODEL_PATH),                          # Absolute or relative to CWD
-        Path(__file__).parent / MODEL_PATH,        # Relative to backend/
-        Path.cwd() / MODEL_PATH,                   # Relative to working directory
-        Path(__file__).parent / "yolov5su.pt",     # Default name in backend/
-    ]
-    
-    model_file = None
-    for loc in model_locations:
-        if loc.exists():
-            model_file = loc
-            logger.info(f"Found model at: {model_file} ({model_file.stat().st_size / (1024*1024):.1f}MB)")
-            break
-    
-    if model_file is None:
-        logger.error(f"Model file not found. Searched locations:")
-        for loc in model_locations:
-            logger.error(f"  - {loc}")
-        raise FileNotFoundError(f"Model file '{MODEL_PATH}' not found in any expected location")
-    
-    # Load model with error handling
-    try:
-        model = YOLO(str(model_file))
-        logger.info(f"✓ Model loaded successfully: {len(model.names)} classes")
-        logger.info(f"  Classes: {', '.join(list(model.names.values())[:10])}...")
-    except Exception as e:
-        logger.error(f"Failed to load model from {model_file}: {e}", exc_info=True)
-        model = None
-        raise
-        
 except ImportError as e:
     logger.warning(f"ML dependencies not available: {e}")
     logger.warning("Running in FALLBACK mode - mock responses only")
@@ -133,25 +238,539 @@ except Exception as e:
     model = None
 
 
+def load_model():
+    """
+    Load the YOLO model and warm it up
+    
+    Runs from the lifespan handler rather than at import, so workers boot
+    fast and each process loads the model exactly once. Falls back to mock
+    mode if the model cannot be loaded.
+    """
+    global model, _labels, _HAS_FULL_STACK
+    
+    if not _HAS_FULL_STACK:
+        return
+    
+    logger.info("Attempting to load YOLOv5 model...")
+    try:
+        model_file = config.get_model_path()
+        logger.info(f"Found model at: {model_file} ({model_file.stat().st_size / (1024*1024):.1f}MB)")
+        
+        pt_model = prepare_model(YOLO(str(model_file)))
+        # Exported models don't carry class names until first predict, so
+        # the label table always comes from the PyTorch weights
+        _labels = build_label_table(pt_model)
+        model = export_model(pt_model, model_file) or pt_model
+        logger.info(f"✓ Model loaded successfully: {len(_labels)} classes")
+        logger.info(f"  Classes: {', '.join(_labels[:10])}...")
+    except Exception as e:
+        logger.error(f"Failed to load model: {e}", exc_info=True)
+        logger.warning("Running in FALLBACK mode - mock responses only")
+        _HAS_FULL_STACK = False
+        model = None
+        _labels = None
+        return
+    
+    warmup_model(model)
+    if model is pt_model:
+        compile_model(model)
+
+
+def publish_model(new_model, labels):
+    """Atomically replace the active model and its label table."""
+    global model, _labels
+    with _model_lock:
+        model, _labels = new_model, labels
+    invalidate_status_cache()
+
+
+def active_model():
+    """Snapshot (model, label table) so a batch never mixes two models."""
+    with _model_lock:
+        return model, _labels
+
+
+def prepare_model(yolo):
+    """Move the model to the GPU in channels-last layout when CUDA is available."""
+    if CUDA_AVAILABLE:
+        yolo.to("cuda")
+        yolo.model.to(memory_format=torch.channels_last)
+    return yolo
+
+
+def export_model(yolo, model_file: Path):
+    """
+    Export the model to TensorRT (CUDA) or ONNX Runtime (CPU) and load it
+    
+    With CPU_INT8 set, CPU hosts get an OpenVINO INT8 model instead,
+    post-training quantized on INT8_CALIBRATION_DATA. The export is built
+    once and cached next to the weights, keyed by target (device +
+    precision), input size and max batch. Returns None when exporting is
+    disabled, the runtime isn't installed or the export fails, so the
+    caller keeps the PyTorch model.
+    
+    Args:
+        yolo: Loaded PyTorch YOLO model
+        model_file: Path of the .pt weights
+    """
+    if not config.EXPORT_MODEL:
+        return None
+    
+    int8 = False
+    if CUDA_AVAILABLE:
+        runtimes, fmt, suffix = ("tensorrt",), "engine", ".engine"
+        major, minor = torch.cuda.get_device_capability()
+        target = f"sm{major}{minor}-{'fp16' if USE_FP16 else 'fp32'}"
+    elif config.CPU_INT8:
+        # nncf performs the quantization; Ultralytics finds OpenVINO models by this suffix
+        runtimes, fmt, suffix = ("openvino", "nncf"), "openvino", "_openvino_model"
+        target = "cpu-int8"
+        int8 = True
+    else:
+        runtimes, fmt, suffix = ("onnxruntime",), "onnx", ".onnx"
+        target = "cpu-fp32"
+    
+    # Check up front: Ultralytics would otherwise try to pip install it
+    missing = [runtime for runtime in runtimes if importlib.util.find_spec(runtime) is None]
+    if missing:
+        logger.info(f"{', '.join(missing)} not installed - using PyTorch model")
+        return None
+    
+    batch = config.INFERENCE_BATCH_MAX
+    export_path = model_file.with_name(f"{model_file.stem}.{target}-{MODEL_IMGSZ}-b{batch}{suffix}")
+    try:
+        if not export_path.exists():
+            logger.info(f"Exporting model to {fmt} (one-time, may take a few minutes)...")
+            # dynamic batch axis so the batched inference worker can send up to `batch` images
+            exported = yolo.export(
+                format=fmt,
+                imgsz=MODEL_IMGSZ,
+                half=USE_FP16,
+                int8=int8,
+                data=config.INT8_CALIBRATION_DATA if int8 else None,
+                dynamic=True,
+                batch=batch,
+                device=0 if CUDA_AVAILABLE else "cpu"
+            )
+            os.replace(exported, export_path)
+        
+        accelerated = YOLO(str(export_path), task=yolo.task)
+        logger.info(f"✓ Using {fmt} export: {export_path.name}")
+        return accelerated
+    except Exception as e:
+        logger.warning(f"Model export to {fmt} failed, using PyTorch model: {e}")
+        return None
+
+
+def build_label_table(yolo):
+    """Flatten model.names ({class_id: name}) into an array indexed by class id."""
+    names = yolo.names
+    return np.asarray([names[i] for i in range(len(names))], dtype=object)
+
+
+def warmup_model(yolo, runs: int = WARMUP_RUNS):
+    """
+    Run dummy inferences so the first real request doesn't pay lazy-init cost
+    
+    The first pass triggers predictor setup, kernel loading and allocator
+    growth; the second lets cuDNN benchmark mode settle on its kernels.
+    """
+    dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+    try:
+        for run in range(1, runs + 1):
+            warmup_start = time.monotonic()
+            yolo(dummy, verbose=False, **_PREDICT_KWARGS)
+            logger.info(f"✓ Model warmup {run}/{runs} took {time.monotonic() - warmup_start:.2f}s")
+    except Exception as e:
+        logger.warning(f"Model warmup failed: {e}")
+
+
+def compile_model(yolo):
+    """
+    Compile the PyTorch forward pass with torch.compile when COMPILE_MODEL is set
+    
+    Only used when no TensorRT/ONNX export is active. Must run after a warmup
+    so the predictor exists: Ultralytics has already folded Conv+BN (fuse())
+    into the module it wraps, and that module is what gets compiled. Shapes
+    are compiled dynamically because batch size and letterboxed input size
+    vary per request. Falls back to the eager model if compilation fails.
+    """
+    if not config.COMPILE_MODEL or yolo.predictor is None:
+        return
+    
+    backend = yolo.predictor.model
+    eager = backend.model
+    try:
+        backend.model = torch.compile(eager, dynamic=True)
+        logger.info("Compiling model with torch.compile (one-time, may take a minute)...")
+        # Compilation is lazy: errors surface here, and the extra run lets
+        # autotuning settle before real traffic
+        dummy = np.zeros((MODEL_IMGSZ, MODEL_IMGSZ, 3), dtype=np.uint8)
+        for _ in range(WARMUP_RUNS + 1):
+            yolo(dummy, verbose=False, **_PREDICT_KWARGS)
+        logger.info("✓ Model compiled")
+    except Exception as e:
+        backend.model = eager
+        logger.warning(f"torch.compile failed, using eager model: {e}")
+
+
+# Batched inference worker: requests hand images to a dedicated thread that
+# coalesces concurrent requests into one model([...]) call, keeping the event
+# loop free while YOLO runs
+_inference_queue: "queue.Queue" = queue.Queue()
+_inference_worker = None
+_INFERENCE_STOP = object()
+
+
+def _collect_batch(first) -> list:
+    """
+    Gather up to INFERENCE_BATCH_MAX pending requests, starting with first
+    
+    Whatever is already queued is taken immediately; the worker only lingers
+    for stragglers (up to INFERENCE_BATCH_WAIT_MS) when requests are already
+    arriving concurrently, so a lone request never pays the wait.
+    """
+    batch = [first]
+    while len(batch) < config.INFERENCE_BATCH_MAX:
+        try:
+            batch.append(_inference_queue.get_nowait())
+        except queue.Empty:
+            break
+    
+    if len(batch) > 1:
+        deadline = time.monotonic() + config.INFERENCE_BATCH_WAIT_MS / 1000
+        while len(batch) < config.INFERENCE_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_inference_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+    return batch
+
+
+def _resolve_future(future, result, error):
+    """Complete an inference future on its own event loop (skipping cancelled requests)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _inference_loop():
+    """Run batched YOLO calls and hand each result back to its request's event loop."""
+    while True:
+        item = _inference_queue.get()
+        if item is _INFERENCE_STOP:
+            return
+        
+        batch = _collect_batch(item)
+        stop = _INFERENCE_STOP in batch
+        batch = [job for job in batch if job is not _INFERENCE_STOP]
+        
+        # Requests are batched per confidence threshold and input kind:
+        # GPU-decoded tensors are stacked into one NCHW batch, arrays go as a list
+        groups: dict = {}
+        for job in batch:
+            is_tensor = not isinstance(job[0], np.ndarray)
+            groups.setdefault((job[1], is_tensor), []).append(job)
+        
+        # Results carry the label table of the model that produced them, so a
+        # concurrent /model/switch can't mislabel an in-flight batch
+        yolo, labels = active_model()
+        for (conf, is_tensor), jobs in groups.items():
+            images = [image for image, _, _, _ in jobs]
+            try:
+                with torch.inference_mode():  # No autograd bookkeeping for pre/post-processing either
+                    source = torch.cat(images) if is_tensor else images
+                    results = yolo(source, conf=conf, verbose=False, **_PREDICT_KWARGS)
+                for (_, _, loop, future), result in zip(jobs, results):
+                    loop.call_soon_threadsafe(_resolve_future, future, (result, labels), None)
+            except Exception as e:
+                for _, _, loop, future in jobs:
+                    loop.call_soon_threadsafe(_resolve_future, future, None, e)
+        
+        if stop:
+            return
+
+
+def start_inference_worker():
+    """Start the batched inference thread (idempotent)."""
+    global _inference_worker
+    if _inference_worker is None or not _inference_worker.is_alive():
+        _inference_worker = threading.Thread(target=_inference_loop, name="inference-worker", daemon=True)
+        _inference_worker.start()
+
+
+def stop_inference_worker():
+    """Ask the inference thread to finish its current batch and exit."""
+    global _inference_worker
+    if _inference_worker is not None:
+        _inference_queue.put(_INFERENCE_STOP)
+        _inference_worker.join(timeout=10)
+        _inference_worker = None
+
+
+async def run_inference(image, conf: float):
+    """
+    Run YOLO on one image via the batched worker without blocking the event loop
+    
+    Returns:
+        (Ultralytics Results object, label table of the model that ran)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _inference_queue.put((image, conf, loop, future))
+    return await future
+
+
+# Single long-lived TTS worker: the pyttsx3 driver is initialized once and
+# all pyttsx3 work runs on this thread. pyttsx3.init() hands out one shared
+# engine per driver, which must never be driven from two threads at once.
+# speak() uses a one-slot, latest-wins mailbox (newer detections replace
+# stale ones); /voice file renders are queued jobs resolved through a future.
+_speech_jobs: "queue.Queue" = queue.Queue()  # None = speak the pending utterance
+_pending_utterance: str | None = None
+_pending_utterance_lock = threading.Lock()
+_speech_worker = None
+_speech_worker_lock = threading.Lock()
+VOICE_FILE_RATE = 150  # /voice render speed (words per minute)
+VOICE_FILE_VOLUME = 1.0  # /voice render volume (0.0 to 1.0)
+
+
+def _render_speech_file(engine, text: str, path: str):
+    """Save text to an audio file, restoring speak()'s voice settings afterwards."""
+    rate, volume = engine.getProperty('rate'), engine.getProperty('volume')
+    engine.setProperty('rate', VOICE_FILE_RATE)
+    engine.setProperty('volume', VOICE_FILE_VOLUME)
+    try:
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+    finally:
+        engine.setProperty('rate', rate)
+        engine.setProperty('volume', volume)
+
+
+def _speech_loop():
+    """Initialize the pyttsx3 engine once, then run queued speech and render jobs forever."""
+    global _pending_utterance
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+    except Exception as e:
+        logger.error(f"Voice engine init failed: {e}")
+        engine = None
+    
+    while True:
+        job = _speech_jobs.get()
+        
+        if job is not None:
+            text, path, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if engine is None:
+                    raise RuntimeError("pyttsx3 engine unavailable")
+                _render_speech_file(engine, text, path)
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+            continue
+        
+        with _pending_utterance_lock:
+            text, _pending_utterance = _pending_utterance, None
+        if text is None:
+            continue
+        if engine is None:
+            logger.info(f"[TTS] {text}")
+            continue
+        try:
+            engine.say(text)
+            engine.runAndWait()
+        except Exception as e:
+            logger.error(f"Voice playback error: {e}")
+
+
+def _ensure_speech_worker():
+    """Start the TTS worker thread on first use."""
+    global _speech_worker
+    if _speech_worker is not None:
+        return
+    with _speech_worker_lock:
+        if _speech_worker is None:
+            _speech_worker = threading.Thread(target=_speech_loop, name="tts-worker", daemon=True)
+            _speech_worker.start()
+
+
+def render_speech_file(text: str, path: Path) -> "concurrent.futures.Future":
+    """Queue a pyttsx3 render of text to path on the TTS worker thread."""
+    _ensure_speech_worker()
+    future = concurrent.futures.Future()
+    _speech_jobs.put((text, str(path), future))
+    return future
+
+
 def speak(text: str):
-    """Speak text using pyttsx3 if available; otherwise just log."""
+    """
+    Speak text using pyttsx3 if available; otherwise just log
+    
+    Replaces any utterance still waiting to be spoken, so bursts of
+    detections announce the latest scene instead of a backlog.
+    """
+    global _pending_utterance
     if _HAS_FULL_STACK and _HAS_TTS:
         try:
-            def run():
-                try:
-                    import pyttsx3
-                    engine = pyttsx3.init()
-                    engine.say(text)
-                    engine.runAndWait()
-                except Exception as e:
-                    logger.error(f"Voice playback error: {e}")
-            threading.Thread(target=run, daemon=True).start()
+            _ensure_speech_worker()
+            with _pending_utterance_lock:
+                stale, _pending_utterance = _pending_utterance, text
+            if stale is None:
+                # Wake the worker; it reads whatever utterance is latest by then
+                _speech_jobs.put(None)
+            else:
+                logger.debug(f"[TTS] Superseded: {stale}")
         except Exception as e:
-            logger.error(f"Failed to spawn TTS thread: {e}")
+            logger.error(f"Failed to queue TTS: {e}")
     else:
         logger.info(f"[TTS] {text}")
 
 
+JPEG_SOI = b"\xff\xd8"
+EXIF_HEADER = b"Exif\x00\x00"
+EXIF_GPS_IFD_TAG = 0x8825
+GPS_LAT_REF, GPS_LAT, GPS_LON_REF, GPS_LON = 1, 2, 3, 4
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+WEBP_EXIF_FLAG = 0x08  # VP8X feature flag: file carries an EXIF chunk
+
+
+# Start-of-frame markers (carry the image size); C4/C8/CC are DHT/JPG/DAC
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_segments(buf: bytes):
+    """
+    Yield (marker, payload start, payload end) for each JPEG header segment
+    
+    Walks segment headers only and stops at start-of-scan, since metadata
+    and frame headers always precede the image data.
+    """
+    i, n = 2, len(buf)
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            return
+        marker = buf[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Standalone markers
+            i += 2
+            continue
+        size = int.from_bytes(buf[i + 2:i + 4], "big")
+        yield marker, i + 4, i + 2 + size
+        i += 2 + size
+
+
+def _find_exif_tiff(buf: bytes) -> memoryview | None:
+    """Return the TIFF block of a JPEG's Exif APP1 segment, or None"""
+    for marker, start, end in _jpeg_segments(buf):
+        if marker == 0xE1 and buf[start:start + 6] == EXIF_HEADER:
+            return memoryview(buf)[start + 6:end]
+    return None
+
+
+def jpeg_dimensions(buf: bytes) -> tuple[int, int] | None:
+    """(width, height) from a JPEG's start-of-frame header, without decoding"""
+    for marker, start, end in _jpeg_segments(buf):
+        if marker in JPEG_SOF_MARKERS and end - start >= 5:
+            height, width = struct.unpack_from(">HH", buf, start + 1)
+            return width, height
+    return None
+
+
+def _ifd_entries(tiff: memoryview, offset: int, order: str):
+    """Yield (tag, type, count, raw 4-byte value/offset) for each entry of an IFD."""
+    count = struct.unpack_from(order + "H", tiff, offset)[0]
+    for k in range(count):
+        yield struct.unpack_from(order + "HHI4s", tiff, offset + 2 + 12 * k)
+
+
+def read_jpeg_gps(image_bytes: bytes) -> tuple[float, float] | None:
+    """
+    Read GPS coordinates from a JPEG's Exif block without a full EXIF parse
+    
+    Only IFD0 (to find the GPS IFD pointer) and the four GPS
+    latitude/longitude tags are read; thumbnails, MakerNote, XMP and IPTC
+    are never touched.
+    
+    Args:
+        image_bytes: Raw JPEG bytes
+        
+    Returns:
+        Tuple of (latitude, longitude) or None if not present or malformed
+    """
+    tiff = _find_exif_tiff(image_bytes)
+    if tiff is None:
+        return None
+    
+    try:
+        order = {b"II": "<", b"MM": ">"}.get(bytes(tiff[:2]))
+        if order is None:
+            return None
+        
+        ifd0 = struct.unpack_from(order + "I", tiff, 4)[0]
+        gps_ifd = next(
+            (struct.unpack(order + "I", raw)[0]
+             for tag, _, _, raw in _ifd_entries(tiff, ifd0, order) if tag == EXIF_GPS_IFD_TAG),
+            None
+        )
+        if gps_ifd is None:
+            return None
+        
+        gps = {tag: raw for tag, _, _, raw in _ifd_entries(tiff, gps_ifd, order)}
+        if not all(tag in gps for tag in (GPS_LAT_REF, GPS_LAT, GPS_LON_REF, GPS_LON)):
+            return None
+        
+        def to_degrees(raw: bytes) -> float:
+            # Three RATIONALs (degrees, minutes, seconds) stored at the given offset
+            d_num, d_den, m_num, m_den, s_num, s_den = struct.unpack_from(
+                order + "6I", tiff, struct.unpack(order + "I", raw)[0]
+            )
+            return d_num / d_den + m_num / (m_den * 60) + s_num / (s_den * 3600)
+        
+        lat = to_degrees(gps[GPS_LAT])
+        if gps[GPS_LAT_REF][:1] == b"S":
+            lat = -lat
+        lon = to_degrees(gps[GPS_LON])
+        if gps[GPS_LON_REF][:1] == b"W":
+            lon = -lon
+        return (lat, lon)
+    except (struct.error, ZeroDivisionError) as e:
+        logger.debug(f"Malformed Exif GPS data: {e}")
+        return None
+
+
+def may_have_exif(buf: bytes) -> bool:
+    """
+    Cheap container sniff for non-JPEG images: False when no Exif can be present
+    
+    Lets extract_gps_from_image skip piexif and PIL entirely for the common
+    case of PNG/WebP/BMP uploads that carry no metadata.
+    """
+    if buf[:8] == PNG_SIGNATURE:
+        # eXIf chunk, or ImageMagick's "Raw profile type exif" text chunk
+        return b"eXIf" in buf or b"Raw profile type exif" in buf
+    if buf[:4] == b"RIFF" and buf[8:12] == b"WEBP":
+        # Only the extended (VP8X) format can hold metadata
+        return buf[12:16] == b"VP8X" and len(buf) > 20 and bool(buf[20] & WEBP_EXIF_FLAG)
+    if buf[:2] == b"BM":
+        return False
+    return True  # TIFF and anything unrecognized: let the parsers decide
+
+
 def extract_gps_from_image(image_bytes: bytes) -> tuple[float, float] | None:
     """
     Extract GPS coordinates from image EXIF data
@@ -162,8 +781,18 @@ def extract_gps_from_image(image_bytes: bytes) -> tuple[float, float] | None:
     Returns:
         Tuple of (latitude, longitude) or None if not found
     """
+    if image_bytes[:2] == JPEG_SOI:
+        # JPEG: read just the GPS tags straight out of the Exif APP1 segment
+        coords = read_jpeg_gps(image_bytes)
+        if coords:
+            logger.info(f"[GPS] Extracted coordinates: {coords[0]}, {coords[1]}")
+        return coords
+    
+    if not may_have_exif(image_bytes):
+        return None
+    
     try:
-        # Try using piexif first
+        # Other formats: try piexif first
         try:
             exif_dict = piexif.load(image_bytes)
             
@@ -234,33 +863,232 @@ def extract_gps_from_image(image_bytes: bytes) -> tuple[float, float] | None:
         return None
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    logger.info("Initializing database...")
-    init_db()
-    logger.info("✓ Database initialized successfully")
+def jpeg_scale_denominator(width: int, height: int) -> int:
+    """
+    Largest libjpeg DCT scale (1/2, 1/4, 1/8) that keeps the long side at or
+    above the model input size
+    
+    YOLO letterboxes to MODEL_IMGSZ anyway, so decoding a 4000px photo at 1/4
+    scale loses nothing the model would see and skips most of the IDCT work.
+    """
+    long_side = max(width, height)
+    for denominator in (8, 4, 2):
+        if long_side // denominator >= MODEL_IMGSZ:
+            return denominator
+    return 1
+
+
+def decode_image(contents: bytes):
+    """
+    Decode uploaded image bytes into a model-ready input
+    
+    On CUDA hosts JPEGs are decoded on the GPU (nvJPEG) and resized there,
+    so only the compressed bytes cross the bus. On CPU, JPEGs go through
+    libjpeg-turbo (PyTurboJPEG) when installed. Everything else is decoded
+    with cv2 straight into the BGR ndarray Ultralytics consumes natively,
+    skipping the PIL decode + RGB convert YOLO would otherwise undo. CPU
+    results are shrunk to the model input size before they reach YOLO.
+    
+    Args:
+        contents: Raw image bytes
+        
+    Returns:
+        (image, (width, height)): an HxWx3 uint8 BGR array or a letterboxed
+        1x3xSxS float RGB CUDA tensor, and the size of the picture within it
+        (the coordinate space of YOLO boxes, used for positions)
+        
+    Raises:
+        ValueError: If the bytes cannot be decoded as an image
+    """
+    is_jpeg = contents[:3] == JPEG_MAGIC
+    
+    if is_jpeg and _HAS_GPU_DECODE:
+        try:
+            return _decode_jpeg_cuda(contents)
+        except Exception as e:
+            logger.debug(f"GPU JPEG decode failed, falling back to CPU: {e}")
+    
+    if is_jpeg and _turbo_jpeg is not None:
+        try:
+            width, height, _, _ = _turbo_jpeg.decode_header(contents)
+            return with_size(fit_to_model_size(_turbo_jpeg.decode(
+                contents,
+                pixel_format=TJPF_BGR,
+                scaling_factor=(1, jpeg_scale_denominator(width, height))
+            )))
+        except Exception as e:
+            logger.debug(f"TurboJPEG decode failed, falling back to cv2: {e}")
+    
+    flags = cv2.IMREAD_COLOR
+    dimensions = jpeg_dimensions(contents) if is_jpeg else None
+    if dimensions:
+        flags = JPEG_REDUCED_FLAGS[jpeg_scale_denominator(*dimensions)]
+    
+    image = cv2.imdecode(
+        np.frombuffer(contents, dtype=np.uint8),
+        flags | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+    if image is None:
+        raise ValueError("unsupported or corrupt image data")
+    return with_size(fit_to_model_size(image))
+
+
+def with_size(image: np.ndarray):
+    """Pair a decoded array with its (width, height)."""
+    return image, (image.shape[1], image.shape[0])
+
+
+def fit_to_model_size(image):
+    """
+    Shrink an ndarray so its long side is at most MODEL_IMGSZ
+    
+    Ultralytics would letterbox oversized inputs down to MODEL_IMGSZ anyway;
+    doing it here with cv2.resize (same INTER_LINEAR filter) caps the cost
+    of everything downstream regardless of upload resolution. Positions are
+    computed against the resized width, so callers need no rescaling.
+    """
+    height, width = image.shape[:2]
+    scale = MODEL_IMGSZ / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+
+
+def _decode_jpeg_cuda(contents: bytes):
+    """
+    Decode a JPEG with nvJPEG and letterbox it to the model input size on the GPU
+    
+    The long side is scaled to MODEL_IMGSZ with the aspect ratio kept, like
+    Ultralytics' own letterbox on the CPU path, and the square is filled up
+    with its padding grey. Padding goes below and to the right, so box
+    coordinates match the resized picture, and every tensor has the same
+    shape for batching and for fixed-size exports. The result already has
+    the model's precision (FP16 unless MODEL_PRECISION=fp32), so the
+    predictor doesn't cast it again.
+    
+    Returns:
+        (1x3xSxS tensor, (width, height) of the resized picture inside it)
+    """
+    with torch.inference_mode():
+        data = torch.frombuffer(bytearray(contents), dtype=torch.uint8)
+        image = decode_jpeg(data, mode=ImageReadMode.RGB, device="cuda")
+        image = image.unsqueeze(0)
+        height, width = image.shape[-2:]
+        scale = MODEL_IMGSZ / max(height, width)
+        height, width = max(1, round(height * scale)), max(1, round(width * scale))
+        
+        image = (image.half() if USE_FP16 else image.float()).div_(255)
+        image = torch.nn.functional.interpolate(
+            image,
+            size=(height, width),
+            mode="bilinear",
+            align_corners=False
+        )
+        letterboxed = image.new_full((1, 3, MODEL_IMGSZ, MODEL_IMGSZ), LETTERBOX_FILL)
+        letterboxed[..., :height, :width] = image
+        return letterboxed, (width, height)
+
+
+# Spoken position for each horizontal zone of the image, indexed left to right
+POSITION_LABELS = ("on the left", "in the center", "on the right")
+
+
+def describe_boxes(boxes, width: int, labels) -> list[dict]:
+    """
+    Convert YOLO boxes into label/confidence/position dicts
+    
+    The whole box tensor is copied to the host in one transfer (a single
+    device sync) and positions are classified in a vectorized pass instead
+    of per-box tensor indexing.
+    
+    Args:
+        boxes: Ultralytics Boxes object from result.boxes
+        width: Width of the source image in pixels
+        labels: Label table of the model that produced the boxes
+        
+    Returns:
+        List of {"label", "confidence", "position"} dicts
+    """
+    # boxes.data rows: x1, y1, x2, y2, [track_id,] conf, cls
+    data = boxes.data.cpu().numpy()
+    confs = data[:, -2]
+    clss = data[:, -1].astype(int)
+    
+    center_x = (data[:, 0].astype(int) + data[:, 2].astype(int)) // 2
+    
+    # Zone index: 0 = left (< w/3), 1 = center, 2 = right (> 2w/3), compared
+    # as 3*cx against w and 2w so the thresholds stay exact integers
+    center_x3 = 3 * center_x
+    zones = (center_x3 >= width).astype(int) + (center_x3 > 2 * width)
+    
+    labels = labels[clss]
+    confs = confs.astype(np.float64).round(2)  # float64 first so 0.9 doesn't serialize as 0.8999999761...
+    positions = np.take(POSITION_LABELS, zones)
+    
+    return [
+        {
+            "label": label,
+            "confidence": conf,
+            "position": position
+        }
+        for label, conf, position in zip(labels.tolist(), confs.tolist(), positions.tolist())
+    ]
+
+
+_timestamp_cache: tuple[int, str] = (-1, "")  # (epoch second, formatted string)
+
+
+def now_str() -> str:
+    """Local "YYYY-MM-DD HH:MM:SS" timestamp, formatted at most once per second."""
+    global _timestamp_cache
+    now = int(time.time())
+    second, formatted = _timestamp_cache
+    if now != second:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _timestamp_cache = (now, formatted)
+    return formatted
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint with system status"""
-    status = {
-        "status": "ok",
-        "stack": "full" if _HAS_FULL_STACK and model is not None else "mock",
-        "model_loaded": model is not None,
-        "tts_available": _HAS_TTS,
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-    }
+    return ORJSONResponse({**_health_body(), "timestamp": now_str()})
+
+
+async def read_upload_limited(file: UploadFile, limit: int) -> bytes:
+    """
+    Read an upload in fixed-size chunks, rejecting it once it exceeds limit
     
-    if model is not None:
-        status["model_classes"] = len(model.names)
+    Memory per request is capped at limit + one chunk instead of the whole body.
+    When the parser already knows the part size, oversized files are rejected
+    without reading and the rest are read in one exactly-sized allocation.
+    
+    Raises:
+        HTTPException 413: Upload is larger than limit
+    """
+    size = getattr(file, "size", None)
+    if size is not None:
+        if size > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Max size: {limit / 1024 / 1024}MB"
+            )
+        return await file.read()
     
-    return JSONResponse(status_code=200, content=status)
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Max size: {limit / 1024 / 1024}MB"
+            )
+    return bytes(buf)
 
 
 @app.post("/detect")
-async def detect(file: UploadFile = File(...)):
+async def detect(request: Request, file: UploadFile = File(...)):
     """
     Object detection endpoint with comprehensive validation and error handling
     
@@ -268,10 +1096,11 @@ async def detect(file: UploadFile = File(...)):
         JSON with detections, spoken text, count, timestamp, and inference time
     
     Raises:
-        HTTPException 422: Invalid input (wrong file type, too large, corrupt)
+        HTTPException 413: File larger than MAX_FILE_SIZE
+        HTTPException 422: Invalid input (wrong file type, empty, corrupt)
         HTTPException 500: Server error (model failure, unexpected error)
     """
-    start_time = time.time()
+    start_ns = time.monotonic_ns()  # Monotonic clock: immune to wall-clock/NTP jumps
     
     # === INPUT VALIDATION ===
     if not file:
@@ -285,25 +1114,19 @@ async def detect(file: UploadFile = File(...)):
         raise HTTPException(status_code=422, detail="Invalid filename")
     
     # Validate file extension
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
-    file_ext = Path(filename).suffix.lower()
-    if file_ext not in allowed_extensions:
+    file_ext = os.path.splitext(filename)[1].lower()  # No Path object just to read the suffix
+    if file_ext not in IMAGE_EXTENSIONS:
         raise HTTPException(
             status_code=422,
-            detail=f"Invalid file type '{file_ext}'. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Invalid file type '{file_ext}'. Allowed: {', '.join(sorted(IMAGE_EXTENSIONS))}"
         )
     
-    # Read file with size limit
-    MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 10 * 1024 * 1024))  # 10MB default
+    # Oversized Content-Length was already rejected by upload_size_limit
+    # Read file in chunks, aborting as soon as the size limit is exceeded
     try:
-        contents = await file.read()
+        contents = await read_upload_limited(file, MAX_FILE_SIZE)
         file_size_mb = len(contents) / (1024 * 1024)
         
-        if len(contents) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=422,
-                detail=f"File too large ({file_size_mb:.1f}MB). Max size: {MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
         if len(contents) == 0:
             raise HTTPException(status_code=422, detail="Empty file")
         
@@ -316,165 +1139,184 @@ async def detect(file: UploadFile = File(...)):
         raise HTTPException(status_code=422, detail=f"Error reading file: {str(e)}")
     
     # === INFERENCE LOGIC ===
+    # Real or mock implementation, resolved once at startup. The payload is
+    # plain str/float/int, so hand it to orjson directly rather than letting
+    # FastAPI walk it through jsonable_encoder first
+    try:
+        return ORJSONResponse(await request.app.state.detect_impl(contents, start_ns))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in /detect: {e}", exc_info=True)
+        speak("An error occurred during detection")
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+
+def save_tag_rows(rows: list[dict]) -> int:
+    """Insert tag rows in their own session (blocking; call via asyncio.to_thread)."""
+    with SessionLocal() as db:
+        return insert_tag_rows(db, rows)
+
+
+async def _detect_real(contents: bytes, start_ns: int) -> dict:
+    """Run YOLO on the uploaded image, speak the result and auto-save GPS-tagged detections."""
     try:
-        if _HAS_FULL_STACK and model is not None:
-            # === REAL INFERENCE PATH ===
+        # Extract GPS coordinates from EXIF data
+        gps_coords = extract_gps_from_image(contents)
+        latitude = gps_coords[0] if gps_coords else None
+        longitude = gps_coords[1] if gps_coords else None
+        
+        if gps_coords:
+            logger.info(f"[GPS] Found coordinates: ({latitude}, {longitude})")
+        else:
+            logger.info("[GPS] No GPS data found in image")
+        
+        # Validate and load image (decode/resize runs off the event loop too)
+        try:
+            image, (image_width, image_height) = await asyncio.to_thread(decode_image, contents)
+            logger.info(f"[DETECT] Image loaded: {image_width}x{image_height}")
+        except Exception as e:
+            logger.error(f"Invalid image file: {e}")
+            raise HTTPException(status_code=422, detail=f"Cannot open image: {str(e)}")
+        
+        # Run YOLOv5 inference with confidence threshold
+        confidence = CONFIDENCE_THRESHOLD
+        try:
+            logger.info(f"[DETECT] Running inference (conf={confidence})...")
+            result, labels = await run_inference(image, confidence)
+            inference_time = (time.monotonic_ns() - start_ns) / 1e9
+            logger.info(f"[DETECT] Inference completed in {inference_time:.2f}s")
+        except Exception as e:
+            logger.error(f"Model inference failed: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Model inference failed: {str(e)}. Check if numpy/torch are properly installed."
+            )
+        
+        boxes = result.boxes
+        timestamp = now_str()
+        
+        # No detections case
+        if boxes is None or len(boxes) == 0:
+            logger.info("[DETECT] No objects detected")
+            speak("No objects detected")
+            return {
+                "detections": [],
+                "message": "No objects detected",
+                "timestamp": timestamp,
+                "inference_time": round(inference_time, 2),
+                "latitude": latitude,
+                "longitude": longitude
+            }
+        
+        # Process detections
+        output = describe_boxes(boxes, image_width, labels)
+        spoken_labels = [f"{d['label']} {d['position']}" for d in output]
+        
+        sentence = "I see " + ", ".join(spoken_labels)
+        speak(sentence)
+        
+        logger.info(f"[DETECT] Found {len(output)} objects")
+        
+        # Auto-save tags to database if GPS coordinates are available
+        if latitude is not None and longitude is not None:
             try:
-                # Extract GPS coordinates from EXIF data
-                gps_coords = extract_gps_from_image(contents)
-                latitude = gps_coords[0] if gps_coords else None
-                longitude = gps_coords[1] if gps_coords else None
-                
-                if gps_coords:
-                    logger.info(f"[GPS] Found coordinates: ({latitude}, {longitude})")
-                else:
-                    logger.info("[GPS] No GPS data found in image")
-                
-                # Validate and load image
-                try:
-                    image = Image.open(io.BytesIO(contents)).convert("RGB")
-                    logger.info(f"[DETECT] Image loaded: {image.size}, mode: {image.mode}")
-                except Exception as e:
-                    logger.error(f"Invalid image file: {e}")
-                    raise HTTPException(status_code=422, detail=f"Cannot open image: {str(e)}")
-                
-                # Run YOLOv5 inference with confidence threshold
-                confidence = float(os.getenv("CONFIDENCE_THRESHOLD", "0.5"))
-                try:
-                    logger.info(f"[DETECT] Running inference (conf={confidence})...")
-                    results = model(image, conf=confidence)
-                    inference_time = time.time() - start_time
-                    logger.info(f"[DETECT] Inference completed in {inference_time:.2f}s")
-                except Exception as e:
-                    logger.error(f"Model inference failed: {e}", exc_info=True)
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Model inference failed: {str(e)}. Check if numpy/torch are properly installed."
-                    )
-                
-                boxes = results[0].boxes
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                
-                # No detections case
-                if boxes is None or len(boxes) == 0:
-                    logger.info("[DETECT] No objects detected")
-                    speak("No objects detected")
-                    return JSONResponse(content={
-                        "detections": [],
-                        "message": "No objects detected",
-                        "timestamp": timestamp,
-                        "inference_time": round(inference_time, 2),
-                        "latitude": latitude,
-                        "longitude": longitude
-                    })
-                
-                # Process detections
-                output = []
-                spoken_labels = []
-                
-                for box in boxes:
-                    conf = float(box.conf[0])
-                    cls = int(box.cls[0])
-                    label = model.names[cls]
-                    
-                    # Calculate position
-                    x1, x2 = int(box.xyxy[0][0]), int(box.xyxy[0][2])
-                    center_x = (x1 + x2) // 2
-                    width = image.width
-                    
-                    position = (
-                        "on the left" if center_x < width / 3 else
-                        "on the right" if center_x > 2 * width / 3 else
-                        "in the center"
-                    )
-                    
-                    directional_label = f"{label} {position}"
-                    output.append({
-                        "label": label,
-                        "confidence": round(conf, 2),
-                        "position": position
-                    })
-                    spoken_labels.append(directional_label)
-                
-                sentence = "I see " + ", ".join(spoken_labels)
-                speak(sentence)
-                
-                logger.info(f"[DETECT] Found {len(output)} objects")
-                
-                # Auto-save tags to database if GPS coordinates are available
-                if latitude is not None and longitude is not None:
-                    try:
-                        from database import SessionLocal
-                        from crud import create_tag
-                        from schemas import TagCreate
-                        
-                        db = SessionLocal()
-                        saved_count = 0
-                        
-                        for detection in output:
-                            tag_data = TagCreate(
-                                location_name=f"Auto-detected at ({latitude:.6f}, {longitude:.6f})",
-                                lat=latitude,
-                                lon=longitude,
-                                tag_type=detection["label"],
-                                source="model",
-                                confidence=detection["confidence"],
-                                notes=f"Position: {detection['position']}"
-                            )
-                            
-                            try:
-                                create_tag(db=db, tag=tag_data)
-                                saved_count += 1
-                            except Exception as e:
-                                logger.error(f"Failed to save tag '{detection['label']}': {e}")
-                        
-                        db.close()
-                        logger.info(f"[AUTO-SAVE] Saved {saved_count}/{len(output)} model tags to database")
-                        
-                    except Exception as e:
-                        logger.error(f"Auto-save failed: {e}", exc_info=True)
-                else:
-                    logger.info("[AUTO-SAVE] Skipped - no GPS coordinates available")
-                
-                return JSONResponse(content={
-                    "detections": output,
-                    "spoken": sentence,
-                    "count": len(output),
-                    "timestamp": timestamp,
-                    "inference_time": round(inference_time, 2),
-                    "latitude": latitude,
-                    "longitude": longitude
-                })
+                # One multi-row INSERT and commit per frame
+                rows = detection_tag_rows(
+                    f"Auto-detected at ({latitude:.6f}, {longitude:.6f})",
+                    latitude,
+                    longitude,
+                    output
+                )
+                saved_count = await asyncio.to_thread(save_tag_rows, rows)
+                logger.info(f"[AUTO-SAVE] Saved {saved_count}/{len(output)} model tags to database")
                 
-            except HTTPException:
-                raise
             except Exception as e:
-                logger.error(f"Inference pipeline failed: {e}", exc_info=True)
-                raise HTTPException(status_code=500, detail=f"Detection failed: {str(e)}")
-        
+                logger.error(f"Auto-save failed: {e}", exc_info=True)
         else:
-            # === MOCK RESPONSE PATH (no ML stack) ===
-            logger.info("[DETECT] Using mock response (ML stack unavailable)")
-            mock = {
-                "detections": [
-                    {"label": "person", "confidence": 0.92, "position": "in the center"},
-                    {"label": "bottle", "confidence": 0.76, "position": "on the right"}
-                ],
-                "spoken": "I see person in the center, bottle on the right",
-                "count": 2,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "inference_time": 0.1,
-                "mode": "mock"
-            }
-            speak(mock["spoken"])
-            return JSONResponse(content=mock)
-            
+            logger.info("[AUTO-SAVE] Skipped - no GPS coordinates available")
+        
+        return {
+            "detections": output,
+            "spoken": sentence,
+            "count": len(output),
+            "timestamp": timestamp,
+            "inference_time": round(inference_time, 2),
+            "latitude": latitude,
+            "longitude": longitude
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in /detect: {e}", exc_info=True)
-        speak("An error occurred during detection")
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+        logger.error(f"Inference pipeline failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Detection failed: {str(e)}")
+
+
+# Canned /detect result for mock mode; only the timestamp varies per request
+MOCK_DETECTION = {
+    "detections": [
+        {"label": "person", "confidence": 0.92, "position": "in the center"},
+        {"label": "bottle", "confidence": 0.76, "position": "on the right"}
+    ],
+    "spoken": "I see person in the center, bottle on the right",
+    "count": 2,
+    "inference_time": 0.1,
+    "mode": "mock"
+}
+
+
+async def _detect_mock(contents: bytes, start_ns: int) -> dict:
+    """Return a canned detection result when the ML stack is unavailable."""
+    logger.info("[DETECT] Using mock response (ML stack unavailable)")
+    speak(MOCK_DETECTION["spoken"])
+    return {**MOCK_DETECTION, "timestamp": now_str()}
+
+
+def resolve_detect_impl():
+    """Pick the /detect implementation for the current model state."""
+    return _detect_real if _HAS_FULL_STACK and model is not None else _detect_mock
+
+
+# Mock until the lifespan handler has loaded a model
+app.state.detect_impl = _detect_mock
+
+
+@lru_cache(maxsize=1)
+def dataset_index(mtime_ns: int) -> list[Path]:
+    """
+    Sorted image files in DATASET_DIR
+    
+    Keyed by the directory's mtime so the listing is built once and reused
+    until files are added or removed. os.scandir reports the entry type
+    from readdir itself, avoiding a stat() per file.
+    
+    Args:
+        mtime_ns: DATASET_DIR's st_mtime_ns (the cache key)
+    """
+    with os.scandir(DATASET_DIR) as entries:
+        return sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+        )
+
+
+async def load_dataset_image(img_path: Path):
+    """
+    Read, GPS-check and decode one dataset image in a worker thread
+    
+    Returns:
+        (latitude, longitude, image, image_width), or None if the image has no GPS data
+    """
+    def load():
+        contents = img_path.read_bytes()
+        gps_coords = extract_gps_from_image(contents)
+        if gps_coords is None:
+            return None
+        image, (image_width, _) = decode_image(contents)
+        return gps_coords[0], gps_coords[1], image, image_width
+    
+    return await asyncio.to_thread(load)
 
 
 @app.post("/detect/batch")
@@ -496,21 +1338,16 @@ async def detect_batch(limit: int = Query(default=10, ge=1, le=100, description=
             detail="Batch processing requires full ML stack with loaded model"
         )
     
-    # Define dataset directory
-    dataset_dir = Path(__file__).parent.parent / "archive" / "vizwiz_data_ver1" / "data" / "Images"
-    
-    if not dataset_dir.exists():
+    try:
+        dataset_mtime = DATASET_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
         raise HTTPException(
             status_code=404,
-            detail=f"Dataset directory not found: {dataset_dir}"
+            detail=f"Dataset directory not found: {DATASET_DIR}"
         )
     
-    # Get list of image files
-    image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
-    image_files = [
-        f for f in dataset_dir.iterdir()
-        if f.is_file() and f.suffix.lower() in image_extensions
-    ]
+    # Get list of image files (cached until the directory changes)
+    image_files = dataset_index(dataset_mtime)
     
     if not image_files:
         raise HTTPException(
@@ -523,113 +1360,86 @@ async def detect_batch(limit: int = Query(default=10, ge=1, le=100, description=
     logger.info(f"[BATCH] Found {len(image_files)} total images, processing {len(images_to_process)}")
     
     results = []
+    tag_rows = []  # Saved for the whole batch with one INSERT at the end
     total_tags_saved = 0
     processed_count = 0
     skipped_count = 0
     error_count = 0
     
-    confidence = float(os.getenv("CONFIDENCE_THRESHOLD", "0.5"))
+    confidence = CONFIDENCE_THRESHOLD
     
-    for img_path in images_to_process:
-        try:
-            logger.info(f"[BATCH] Processing: {img_path.name}")
-            
-            # Read image file
-            with open(img_path, 'rb') as f:
-                contents = f.read()
-            
-            # Extract GPS coordinates
-            gps_coords = extract_gps_from_image(contents)
-            latitude = gps_coords[0] if gps_coords else None
-            longitude = gps_coords[1] if gps_coords else None
-            
-            # Skip images without GPS data
-            if latitude is None or longitude is None:
+    # Decode a chunk of images, then submit them together so the inference
+    # worker runs them as one batched forward pass instead of one at a time.
+    # The next chunk is read and decoded in worker threads while the current
+    # one is on the model, so disk I/O overlaps inference.
+    chunk_size = config.INFERENCE_BATCH_MAX
+    chunks = [images_to_process[i:i + chunk_size] for i in range(0, len(images_to_process), chunk_size)]
+    
+    def start_loading(chunk: list[Path]) -> list[asyncio.Task]:
+        return [asyncio.create_task(load_dataset_image(img_path)) for img_path in chunk]
+    
+    pending = start_loading(chunks[0]) if chunks else []
+    for index, chunk in enumerate(chunks):
+        loaded = await asyncio.gather(*pending, return_exceptions=True)
+        pending = start_loading(chunks[index + 1]) if index + 1 < len(chunks) else []
+        
+        prepared = []  # (img_path, latitude, longitude, image, image_width)
+        for img_path, outcome in zip(chunk, loaded):
+            if isinstance(outcome, BaseException):
+                logger.error(f"[BATCH] Error processing {img_path.name}: {outcome}")
+                error_count += 1
+            elif outcome is None:
+                # Skip images without GPS data
                 logger.info(f"[BATCH] Skipped {img_path.name} - no GPS data")
                 skipped_count += 1
-                continue
-            
-            # Load and process image
-            image = Image.open(io.BytesIO(contents)).convert("RGB")
-            results_obj = model(image, conf=confidence)
-            boxes = results_obj[0].boxes
-            
-            if boxes is None or len(boxes) == 0:
-                logger.info(f"[BATCH] No detections in {img_path.name}")
-                processed_count += 1
-                continue
-            
-            # Process detections
-            detections = []
-            for box in boxes:
-                conf = float(box.conf[0])
-                cls = int(box.cls[0])
-                label = model.names[cls]
-                
-                # Calculate position
-                x1, x2 = int(box.xyxy[0][0]), int(box.xyxy[0][2])
-                center_x = (x1 + x2) // 2
-                width = image.width
-                
-                position = (
-                    "on the left" if center_x < width / 3 else
-                    "on the right" if center_x > 2 * width / 3 else
-                    "in the center"
-                )
-                
-                detections.append({
-                    "label": label,
-                    "confidence": round(conf, 2),
-                    "position": position
-                })
-            
-            # Auto-save tags to database
-            tags_saved = 0
+            else:
+                logger.info(f"[BATCH] Processing: {img_path.name}")
+                prepared.append((img_path, *outcome))
+        
+        outcomes = await asyncio.gather(
+            *(run_inference(image, confidence) for _, _, _, image, _ in prepared),
+            return_exceptions=True
+        )
+        
+        for (img_path, latitude, longitude, image, image_width), outcome in zip(prepared, outcomes):
             try:
-                from database import SessionLocal
-                from crud import create_tag
-                from schemas import TagCreate
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                result, labels = outcome
+                boxes = result.boxes
                 
-                db = SessionLocal()
+                if boxes is None or len(boxes) == 0:
+                    logger.info(f"[BATCH] No detections in {img_path.name}")
+                    processed_count += 1
+                    continue
                 
-                for detection in detections:
-                    tag_data = TagCreate(
-                        location_name=f"Dataset: {img_path.name}",
-                        lat=latitude,
-                        lon=longitude,
-                        tag_type=detection["label"],
-                        source="model",
-                        confidence=detection["confidence"],
-                        notes=f"Position: {detection['position']}"
-                    )
-                    
-                    try:
-                        create_tag(db=db, tag=tag_data)
-                        tags_saved += 1
-                    except Exception as e:
-                        logger.error(f"Failed to save tag '{detection['label']}': {e}")
+                # Process detections
+                detections = describe_boxes(boxes, image_width, labels)
+                rows = detection_tag_rows(f"Dataset: {img_path.name}", latitude, longitude, detections)
+                tag_rows.extend(rows)
                 
-                db.close()
-                total_tags_saved += tags_saved
+                results.append({
+                    "filename": img_path.name,
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "detections": detections,
+                    "tags_saved": len(rows)
+                })
                 
-            except Exception as e:
-                logger.error(f"Database save error for {img_path.name}: {e}")
-            
-            results.append({
-                "filename": img_path.name,
-                "latitude": latitude,
-                "longitude": longitude,
-                "detections": detections,
-                "tags_saved": tags_saved
-            })
-            
-            processed_count += 1
-            logger.info(f"[BATCH] Processed {img_path.name}: {len(detections)} detections, {tags_saved} tags saved")
+                processed_count += 1
+                logger.info(f"[BATCH] Processed {img_path.name}: {len(detections)} detections")
             
-        except Exception as e:
-            logger.error(f"[BATCH] Error processing {img_path.name}: {e}")
-            error_count += 1
-            continue
+            except Exception as e:
+                logger.error(f"[BATCH] Error processing {img_path.name}: {e}")
+                error_count += 1
+    
+    # Auto-save tags to database: one session and transaction for the batch
+    try:
+        total_tags_saved = await asyncio.to_thread(save_tag_rows, tag_rows)
+    except Exception as e:
+        logger.error(f"[BATCH] Database save error: {e}")
+        for entry in results:
+            entry["tags_saved"] = 0
     
     summary = {
         "total_images_found": len(image_files),
@@ -642,11 +1452,93 @@ async def detect_batch(limit: int = Query(default=10, ge=1, le=100, description=
     
     logger.info(f"[BATCH] Complete: {processed_count} processed, {skipped_count} skipped, {error_count} errors, {total_tags_saved} tags saved")
     
-    return JSONResponse(content=summary)
+    # Already plain JSON types: skip jsonable_encoder's walk over every result
+    return ORJSONResponse(summary)
+
+
+# Generated speech is cached on disk, keyed by engine + voice settings + text
+AUDIO_DIR = Path(tempfile.gettempdir()) / "accessatlas_audio"
+AUDIO_MAX_AGE_SECONDS = 3600  # Cleanup removes files not used for an hour
+AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "100"))  # then trims least recently used
+AUDIO_CACHE_ENABLED = AUDIO_CACHE_MAX_MB > 0  # 0 disables the cache: nothing is left on disk
+AUDIO_HTTP_MAX_AGE_SECONDS = 86400  # Browser cache lifetime for /voice responses
+AUDIO_CLEANUP_INTERVAL_SECONDS = 600  # Background sweep period
+# RAM-backed scratch space (tmpfs on Linux) for pyttsx3 renders that aren't cached
+AUDIO_SCRATCH_DIR = Path("/dev/shm") if os.path.isdir("/dev/shm") else Path(tempfile.gettempdir())
+
+
+def audio_cache_path(text: str) -> Path:
+    """Content-addressed cache location for the speech rendering of text."""
+    key = hashlib.sha256(f"{_TTS_ENGINE}|en|com|slow=0|{text}".encode("utf-8")).hexdigest()
+    return AUDIO_DIR / f"speech_{key}.mp3"
+
+
+def audio_temp_path(audio_path: Path) -> Path:
+    """Private scratch path next to a cache entry, for atomic os.replace into place."""
+    return audio_path.with_name(f"{audio_path.stem}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def persist_audio(audio_path: Path, audio_bytes: bytes):
+    """Write rendered speech into the cache (runs after the response is sent)."""
+    tmp_path = audio_temp_path(audio_path)
+    try:
+        tmp_path.write_bytes(audio_bytes)
+        os.replace(tmp_path, audio_path)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.warning(f"[VOICE] Failed to cache {audio_path.name}: {e}")
+
+
+def audio_etag(filename: str) -> str:
+    """
+    Weak ETag for a speech file, from the text hash already in its name
+    
+    Weak because it identifies the text, not the bytes: gTTS may render
+    the same text slightly differently between calls.
+    """
+    return f'W/"{Path(filename).stem.removeprefix("speech_")[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak If-None-Match comparison: "*" or any listed tag with the same opaque value."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == opaque
+        for candidate in (part.strip() for part in if_none_match.split(","))
+    )
+
+
+def audio_headers(filename: str) -> dict:
+    """
+    Download headers for generated MP3 responses
+    
+    The same text always maps to the same audio, so browsers may cache it
+    and revalidate with If-None-Match instead of downloading it again.
+    """
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": f"public, max-age={AUDIO_HTTP_MAX_AGE_SECONDS}",
+        "ETag": audio_etag(filename)
+    }
+
+
+def audio_file_response(audio_path: Path) -> FileResponse:
+    """Serve a cached MP3 as a download."""
+    return FileResponse(
+        path=str(audio_path),
+        media_type="audio/mpeg",
+        filename=audio_path.name,
+        headers=audio_headers(audio_path.name)
+    )
 
 
 @app.get("/voice")
-async def generate_voice(text: str = Query(..., min_length=1, max_length=500, description="Text to convert to speech")):
+async def generate_voice(
+    request: Request,
+    text: str = Query(..., min_length=1, max_length=500, description="Text to convert to speech")
+):
     """
     Text-to-speech endpoint that generates and returns an MP3 file.
     
@@ -654,7 +1546,8 @@ async def generate_voice(text: str = Query(..., min_length=1, max_length=500, de
         text: Text to convert to speech (1-500 characters)
     
     Returns:
-        FileResponse: Downloadable MP3 audio file
+        Downloadable MP3 audio (served from the speech cache when available),
+        or 304 Not Modified when If-None-Match matches the text's ETag
     
     Raises:
         HTTPException 400: Invalid text input
@@ -676,15 +1569,25 @@ async def generate_voice(text: str = Query(..., min_length=1, max_length=500, de
         )
     
     try:
-        # Generate unique filename to avoid collisions
-        unique_id = uuid.uuid4().hex[:8]
-        timestamp = int(time.time())
-        filename = f"speech_{timestamp}_{unique_id}.mp3"
+        # Content-addressed cache: identical text is synthesized only once
+        AUDIO_DIR.mkdir(exist_ok=True)
+        audio_path = audio_cache_path(text)
+        filename = audio_path.name
         
-        # Use temp directory for audio files
-        temp_dir = Path(tempfile.gettempdir()) / "accessatlas_audio"
-        temp_dir.mkdir(exist_ok=True)
-        audio_path = temp_dir / filename
+        # The client already holds this exact audio
+        if etag_matches(request.headers.get("if-none-match"), audio_etag(filename)):
+            logger.info(f"[VOICE] Not modified: {filename}")
+            return Response(status_code=304, headers=audio_headers(filename))
+        
+        try:
+            cached_size = audio_path.stat().st_size
+        except FileNotFoundError:
+            cached_size = 0
+        
+        if cached_size > 0:
+            os.utime(audio_path)  # Refresh mtime so cleanup evicts least recently used first
+            logger.info(f"[VOICE] Cache hit: {filename} ({cached_size} bytes)")
+            return audio_file_response(audio_path)
         
         # Generate audio based on available engine
         if _TTS_ENGINE == "gtts":
@@ -700,9 +1603,12 @@ async def generate_voice(text: str = Query(..., min_length=1, max_length=500, de
                     tld='com'  # Use google.com (US accent)
                 )
                 
-                # Save to file
-                tts.save(str(audio_path))
-                logger.info(f"[VOICE] Audio generated with gTTS: {audio_path} ({audio_path.stat().st_size} bytes)")
+                # Render into memory and answer straight from the buffer;
+                # the cache file is written after the response is sent
+                buf = io.BytesIO()
+                tts.write_to_fp(buf)
+                audio_bytes = buf.getvalue()
+                logger.info(f"[VOICE] Audio generated with gTTS: {filename} ({len(audio_bytes)} bytes)")
                 
             except Exception as e:
                 logger.error(f"gTTS generation failed: {e}", exc_info=True)
@@ -710,28 +1616,42 @@ async def generate_voice(text: str = Query(..., min_length=1, max_length=500, de
                     status_code=500,
                     detail=f"Audio generation failed: {str(e)}"
                 )
+            
+            if not audio_bytes:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Audio file generation failed - empty file"
+                )
+            
+            return Response(
+                content=audio_bytes,
+                media_type="audio/mpeg",
+                headers=audio_headers(filename),
+                background=BackgroundTask(persist_audio, audio_path, audio_bytes) if AUDIO_CACHE_ENABLED else None
+            )
         
         elif _TTS_ENGINE == "pyttsx3":
             # Fallback to pyttsx3 (requires system TTS, saves to file)
+            # Render to a private temp file and move it into place atomically, so
+            # concurrent requests for the same text never serve a partial file
+            tmp_path = audio_temp_path(audio_path)
+            if not AUDIO_CACHE_ENABLED:
+                # Nothing is kept: render in RAM and serve the bytes from memory
+                tmp_path = AUDIO_SCRATCH_DIR / tmp_path.name
             try:
-                import pyttsx3
-                
-                engine = pyttsx3.init()
-                engine.setProperty('rate', 150)  # Speed (words per minute)
-                engine.setProperty('volume', 1.0)  # Volume (0.0 to 1.0)
-                
-                # Save to file (pyttsx3 supports wav/mp3 depending on system)
+                # Rendered on the TTS worker thread, which owns the pyttsx3 engine
+                # (pyttsx3 supports wav/mp3 depending on system)
                 # Note: pyttsx3.save_to_file may not work on all platforms
-                engine.save_to_file(text, str(audio_path))
-                engine.runAndWait()
+                await asyncio.wrap_future(render_speech_file(text, tmp_path))
                 
                 # Check if file was created
-                if not audio_path.exists() or audio_path.stat().st_size == 0:
+                if not tmp_path.exists() or tmp_path.stat().st_size == 0:
                     raise Exception("pyttsx3 failed to generate audio file")
                 
                 logger.info(f"[VOICE] Audio generated with pyttsx3: {audio_path}")
                 
             except Exception as e:
+                tmp_path.unlink(missing_ok=True)
                 logger.error(f"pyttsx3 generation failed: {e}", exc_info=True)
                 raise HTTPException(
                     status_code=500,
@@ -742,36 +1662,28 @@ async def generate_voice(text: str = Query(..., min_length=1, max_length=500, de
             raise HTTPException(status_code=503, detail="No TTS engine available")
         
         # Verify file was created successfully
-        if not audio_path.exists():
+        if not tmp_path.exists():
             raise HTTPException(
                 status_code=500,
                 detail="Audio file generation failed - file not created"
             )
         
-        file_size = audio_path.stat().st_size
+        file_size = tmp_path.stat().st_size
         if file_size == 0:
-            audio_path.unlink(missing_ok=True)
+            tmp_path.unlink(missing_ok=True)
             raise HTTPException(
                 status_code=500,
                 detail="Audio file generation failed - empty file"
             )
         
         logger.info(f"[VOICE] Serving audio file: {filename} ({file_size} bytes)")
+        if not AUDIO_CACHE_ENABLED:
+            audio_bytes = tmp_path.read_bytes()
+            tmp_path.unlink(missing_ok=True)
+            return Response(content=audio_bytes, media_type="audio/mpeg", headers=audio_headers(filename))
         
-        # Return file as downloadable response
-        # Note: FileResponse with background task will auto-delete after serving
-        return FileResponse(
-            path=str(audio_path),
-            media_type="audio/mpeg",
-            filename=filename,
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0"
-            },
-            background=None  # Don't auto-delete; cleanup happens via separate task
-        )
+        os.replace(tmp_path, audio_path)
+        return audio_file_response(audio_path)
         
     except HTTPException:
         raise
@@ -793,67 +1705,168 @@ async def voice_speak(text: str = Query(..., min_length=1, max_length=500)):
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
     speak(text)
-    return JSONResponse(status_code=200, content={
+    return {
         "status": "speaking",
         "text": text,
         "note": "Use GET /voice?text=... for downloadable MP3 files"
-    })
+    }
 
 
-@app.delete("/voice/cleanup")
-async def cleanup_audio_files():
+def sweep_audio_cache() -> tuple[int, int]:
     """
-    Cleanup old temporary audio files (older than 1 hour).
-    Called automatically or manually to free up disk space.
+    Remove audio files unused for over an hour, then trim the speech cache
+    to AUDIO_CACHE_MAX_MB, least recently used first
+    
+    Recency is the file mtime, which /voice refreshes on every cache hit
+    (atime is unreliable on relatime/noatime mounts). Temp files older than
+    the same age are left over from interrupted renders and are removed too.
+    
+    Returns:
+        (files removed, bytes freed)
     """
+    cleaned_count = 0
+    cleaned_size = 0
+    current_time = time.time()
+    kept = []  # (mtime, size, name, path) of files that survive the age check
+    
+    # One scandir pass with one stat per file; no Path objects or glob matching
     try:
-        temp_dir = Path(tempfile.gettempdir()) / "accessatlas_audio"
-        if not temp_dir.exists():
-            return JSONResponse(content={"status": "ok", "cleaned": 0, "message": "No temp directory"})
-        
-        cleaned_count = 0
-        cleaned_size = 0
-        current_time = time.time()
-        
-        for audio_file in temp_dir.glob("speech_*.mp3"):
+        entries = os.scandir(AUDIO_DIR)
+    except FileNotFoundError:
+        return 0, 0
+    
+    with entries:
+        for entry in entries:
+            name = entry.name
+            is_temp = name.endswith(".tmp")
+            if not (name.startswith("speech_") and (is_temp or name.endswith(".mp3"))):
+                continue
             try:
-                # Remove files older than 1 hour
-                file_age = current_time - audio_file.stat().st_mtime
-                if file_age > 3600:  # 1 hour in seconds
-                    file_size = audio_file.stat().st_size
-                    audio_file.unlink()
+                # Remove files not used for over an hour
+                file_stat = entry.stat()
+                if current_time - file_stat.st_mtime > AUDIO_MAX_AGE_SECONDS:
+                    os.unlink(entry.path)
                     cleaned_count += 1
-                    cleaned_size += file_size
-                    logger.info(f"[CLEANUP] Removed old audio file: {audio_file.name}")
+                    cleaned_size += file_stat.st_size
+                    logger.info(f"[CLEANUP] Removed old audio file: {name}")
+                elif not is_temp:
+                    kept.append((file_stat.st_mtime, file_stat.st_size, name, entry.path))
             except Exception as e:
-                logger.warning(f"Failed to remove {audio_file}: {e}")
-        
-        return JSONResponse(content={
-            "status": "ok",
-            "cleaned": cleaned_count,
-            "size_freed_mb": round(cleaned_size / (1024 * 1024), 2),
-            "message": f"Cleaned {cleaned_count} old audio files"
-        })
-    except Exception as e:
-        logger.error(f"Cleanup failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
+                logger.warning(f"Failed to remove {entry.path}: {e}")
+    
+    # Trim the cache to its size cap, least recently used first
+    cache_size = sum(size for _, size, _, _ in kept)
+    cache_limit = AUDIO_CACHE_MAX_MB * 1024 * 1024
+    for _, size, name, path in sorted(kept, key=lambda entry: entry[0]):
+        if cache_size <= cache_limit:
+            break
+        try:
+            os.unlink(path)
+            cache_size -= size
+            cleaned_count += 1
+            cleaned_size += size
+            logger.info(f"[CLEANUP] Evicted cached audio file: {name}")
+        except Exception as e:
+            logger.warning(f"Failed to remove {path}: {e}")
+    
+    return cleaned_count, cleaned_size
 
 
-@app.get("/models")
-async def list_models():
-    """List available YOLOv5 models"""
+async def audio_cleanup_loop():
+    """Sweep the speech cache every AUDIO_CLEANUP_INTERVAL_SECONDS until cancelled."""
+    while True:
+        await asyncio.sleep(AUDIO_CLEANUP_INTERVAL_SECONDS)
+        try:
+            cleaned_count, cleaned_size = await asyncio.to_thread(sweep_audio_cache)
+            if cleaned_count:
+                logger.info(f"[CLEANUP] Removed {cleaned_count} audio files ({cleaned_size / (1024 * 1024):.2f}MB)")
+        except Exception as e:
+            logger.error(f"Audio cleanup failed: {e}", exc_info=True)
+
+
+# /health, /models and /info change only when a model is loaded or switched, so
+# their bodies (minus the timestamp) are built once and reused until then
+@lru_cache(maxsize=1)
+def _health_body() -> dict:
+    """Build the /health response body, without the timestamp"""
+    status = {
+        "status": "ok",
+        "stack": "full" if _HAS_FULL_STACK and model is not None else "mock",
+        "model_loaded": model is not None,
+        "tts_available": _HAS_TTS
+    }
+    
+    if model is not None:
+        status["model_classes"] = len(_labels)
+    
+    return status
+
+
+@lru_cache(maxsize=1)
+def _models_body() -> dict:
+    """Build the /models response body"""
     available_models = ['yolov5n', 'yolov5s', 'yolov5m', 'yolov5l', 'yolov5x', 'yolov5su']
     current_model = 'yolov5su' if model is None else getattr(model, 'model_name', 'yolov5su')
-    return JSONResponse(status_code=200, content={
+    return {
         "available_models": available_models,
         "current_model": current_model,
         "loaded": model is not None
-    })
+    }
+
+
+@lru_cache(maxsize=1)
+def _info_body() -> dict:
+    """Build the /info response body, without the timestamp"""
+    return {
+        "name": "AccessAtlas Backend",
+        "version": "1.0.0",
+        "mode": "full" if _HAS_FULL_STACK and model is not None else "mock",
+        "model_loaded": model is not None,
+        "tts_available": _HAS_TTS
+    }
+
+
+def invalidate_status_cache():
+    """Drop the cached /health, /models and /info bodies after the model changes"""
+    _health_body.cache_clear()
+    _models_body.cache_clear()
+    _info_body.cache_clear()
+
+
+@app.get("/models")
+async def list_models():
+    """List available YOLOv5 models"""
+    return ORJSONResponse(_models_body())
+
+
+MODEL_CACHE_SIZE = 3  # Recently switched-to models kept loaded (each holds its weights in memory)
+_model_switch_lock = asyncio.Lock()
+# model_name -> (model, label table), least recently used first; only touched on the event loop
+_model_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def load_switch_model(model_name: str):
+    """Load, prepare and warm up a model off the event loop, ready to publish."""
+    new_model = prepare_model(YOLO(f"{model_name}.pt"))
+    labels = build_label_table(new_model)
+    warmup_model(new_model)
+    compile_model(new_model)
+    return new_model, labels
 
 
 @app.post("/model/switch")
 async def switch_model(model_name: str):
-    """Switch to a different YOLOv5 model"""
+    """
+    Switch to a different YOLOv5 model
+    
+    The new model is loaded and warmed up in a worker thread while the old
+    one keeps serving, then swapped in atomically. In-flight batches finish
+    on the old model. The last MODEL_CACHE_SIZE models stay loaded, so
+    switching back to one of them is an immediate swap.
+    
+    Raises:
+        HTTPException 409: Another switch is in progress
+    """
     if not model_name:
         raise HTTPException(status_code=400, detail="model_name is required")
     
@@ -863,27 +1876,57 @@ async def switch_model(model_name: str):
             detail="Model switching requires full stack (torch/ultralytics)"
         )
     
-    try:
-        global model
-        logger.info(f"Switching to model: {model_name}")
-        model = YOLO(f"{model_name}.pt")
-        return JSONResponse(status_code=200, content={
+    if _model_switch_lock.locked():
+        raise HTTPException(status_code=409, detail="A model switch is already in progress")
+    
+    cached = _model_cache.get(model_name)
+    if cached is not None:
+        _model_cache.move_to_end(model_name)
+        publish_model(*cached)
+        logger.info(f"Switched to cached model: {model_name}")
+        return {
             "status": "switched",
             "model": model_name
-        })
-    except Exception as e:
-        logger.error(f"Failed to switch model: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Model switch failed: {str(e)}")
+        }
+    
+    async with _model_switch_lock:
+        try:
+            logger.info(f"Switching to model: {model_name}")
+            new_model, labels = await asyncio.to_thread(load_switch_model, model_name)
+            publish_model(new_model, labels)
+            _model_cache[model_name] = (new_model, labels)
+            if len(_model_cache) > MODEL_CACHE_SIZE:
+                _model_cache.popitem(last=False)
+            return {
+                "status": "switched",
+                "model": model_name
+            }
+        except Exception as e:
+            logger.error(f"Failed to switch model: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Model switch failed: {str(e)}")
 
 
 @app.get("/info")
 async def get_info():
     """Get API information"""
-    return JSONResponse(status_code=200, content={
-        "name": "AccessAtlas Backend",
-        "version": "1.0.0",
-        "mode": "full" if _HAS_FULL_STACK and model is not None else "mock",
-        "model_loaded": model is not None,
-        "tts_available": _HAS_TTS,
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-    })
+    return ORJSONResponse({**_info_body(), "timestamp": now_str()})
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # Create the schema before spawning workers: each worker's lifespan still
+    # runs init_db(), but then only finds existing tables instead of racing to create them
+    init_db()
+    
+    # "auto" picks uvloop and httptools (C event loop / HTTP parser) when
+    # installed and falls back to asyncio / h11, e.g. on Windows
+    uvicorn.run(
+        "main:app",
+        host=config.HOST,
+        port=config.PORT,
+        workers=config.WORKERS,
+        loop="auto",
+        http="auto",
+        access_log=config.ACCESS_LOG
+    )
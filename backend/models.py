@@ -1,7 +1,7 @@
 """
 SQLAlchemy ORM models for database tables
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from database import Base
 import enum
@@ -27,12 +27,18 @@ class AccessibilityTag(Base):
     SQLAlchemy model for accessibility tags
     """
     __tablename__ = "accessibility_tags"
+    __table_args__ = (
+        # Serves location lookups ordered by newest first without a sort step
+        Index("ix_tag_loc_created", "location_name", "created_at"),
+        # Serves the lat/lon bounding-box filter of proximity searches
+        Index("ix_tag_latlon", "lat", "lon"),
+    )
 
     # Primary key
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Already indexed as the primary key
     
-    # Location info
-    location_name = Column(String, index=True, nullable=False)
+    # Location info (lookups by name use the ix_tag_loc_created prefix)
+    location_name = Column(String, nullable=False)
     lat = Column(Float, nullable=False)
     lon = Column(Float, nullable=False)
     
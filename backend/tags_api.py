@@ -1,17 +1,18 @@
 """
 FastAPI routes for accessibility tags storage and retrieval
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict
 import logging
 
+from config import config
 from database import get_db
 from schemas import (
     TagsRequest,
     TagsGroupedResponse,
     StoreTagsResponse,
-    TagResponse,
     TagSource
 )
 from crud import (
@@ -19,18 +20,53 @@ from crud import (
     get_tags_by_location,
     get_all_locations,
     delete_tag,
-    get_tag_statistics
+    get_tag_statistics,
+    DEFAULT_TAG_LIMIT
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound for the ?limit= page size on tag lookups
+MAX_TAG_LIMIT = 1000
+
 # Create router
+# Handlers are plain `def`: they use a blocking Session, so FastAPI runs
+# them in its threadpool instead of stalling the event loop on DB I/O
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
+
+def read_response(body):
+    """
+    Send a read endpoint's body, skipping FastAPI's response validation
+    
+    Bodies are built from our own database rows, so re-validating them
+    against the response_model (still used for the OpenAPI docs) is pure
+    overhead. VALIDATE_API_RESPONSE=true restores validation for debugging.
+    """
+    return body if config.VALIDATE_API_RESPONSE else ORJSONResponse(body)
+
+
+def tag_to_dict(tag) -> Dict:
+    """Serialize a database tag in the TagResponse shape (tag_type sent as "type")"""
+    return {
+        "id": tag.id,
+        "type": tag.tag_type.value,
+        "lat": tag.lat,
+        "lon": tag.lon,
+        "source": tag.source.value,
+        "address": tag.address,
+        "confidence": tag.confidence,
+        "osm_id": tag.osm_id,
+        "notes": tag.notes,
+        "created_at": tag.created_at,
+        "updated_at": tag.updated_at
+    }
+
+
 @router.post("/store", response_model=StoreTagsResponse, status_code=status.HTTP_201_CREATED)
-async def store_tags(
+def store_tags(
     request: TagsRequest,
     db: Session = Depends(get_db)
 ):
@@ -61,7 +97,7 @@ async def store_tags(
             )
         
         # Create tags in database
-        created_tags = create_tags(
+        tag_ids = create_tags(
             db=db,
             location_name=request.location_name,
             location_lat=request.lat,
@@ -69,8 +105,6 @@ async def store_tags(
             tags=request.tags
         )
         
-        tag_ids = [tag.id for tag in created_tags]
-        
         logger.info(f"Successfully stored {len(tag_ids)} tags with IDs: {tag_ids}")
         
         return StoreTagsResponse(
@@ -91,11 +125,13 @@ async def store_tags(
         )
 
 @router.get("/location/{location_name}", response_model=TagsGroupedResponse)
-async def get_tags(
+def get_tags(
     location_name: str,
     radius_km: float = None,
     lat: float = None,
     lon: float = None,
+    limit: int = Query(DEFAULT_TAG_LIMIT, ge=1, le=MAX_TAG_LIMIT),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """
@@ -108,6 +144,8 @@ async def get_tags(
     - radius_km: Search radius in kilometers
     - lat: Center latitude for proximity search
     - lon: Center longitude for proximity search
+    - limit: Maximum number of tags to return, newest first (default 500, max 1000)
+    - offset: Number of tags to skip, for paging
     
     **Response:**
     - location_name: Location name
@@ -125,30 +163,15 @@ async def get_tags(
             location_name=location_name,
             radius_km=radius_km,
             lat=lat,
-            lon=lon
+            lon=lon,
+            limit=limit,
+            offset=offset
         )
         
         # Convert to response format with proper field mapping
-        def db_tag_to_response(tag):
-            """Convert database tag to response schema"""
-            return TagResponse(
-                id=tag.id,
-                tag_type=tag.tag_type.value,
-                lat=tag.lat,
-                lon=tag.lon,
-                source=tag.source,
-                address=tag.address,
-                confidence=tag.confidence,
-                osm_id=tag.osm_id,
-                notes=tag.notes,
-                created_at=tag.created_at,
-                updated_at=tag.updated_at
-            )
-        
-        response_tags: Dict[TagSource, List[TagResponse]] = {
-            TagSource.user: [db_tag_to_response(tag) for tag in grouped_tags[TagSource.user.value]],
-            TagSource.osm: [db_tag_to_response(tag) for tag in grouped_tags[TagSource.osm.value]],
-            TagSource.model: [db_tag_to_response(tag) for tag in grouped_tags[TagSource.model.value]]
+        response_tags: Dict[str, List[Dict]] = {
+            source.value: [tag_to_dict(tag) for tag in grouped_tags[source.value]]
+            for source in (TagSource.user, TagSource.osm, TagSource.model)
         }
         
         total_tags = sum(len(tags) for tags in response_tags.values())
@@ -165,15 +188,15 @@ async def get_tags(
                 response_lat = 0.0
                 response_lon = 0.0
         
-        logger.info(f"Retrieved {total_tags} tags (user: {len(response_tags[TagSource.user])}, osm: {len(response_tags[TagSource.osm])}, model: {len(response_tags[TagSource.model])})")
+        logger.info(f"Retrieved {total_tags} tags (user: {len(response_tags['user'])}, osm: {len(response_tags['osm'])}, model: {len(response_tags['model'])})")
         
-        return TagsGroupedResponse(
-            location_name=location_name,
-            lat=response_lat,
-            lon=response_lon,
-            total_tags=total_tags,
-            tags=response_tags
-        )
+        return read_response({
+            "location_name": location_name,
+            "lat": response_lat,
+            "lon": response_lon,
+            "total_tags": total_tags,
+            "tags": response_tags
+        })
     
     except Exception as e:
         logger.error(f"Error retrieving tags: {str(e)}", exc_info=True)
@@ -183,7 +206,7 @@ async def get_tags(
         )
 
 @router.get("/locations", response_model=List[Dict])
-async def list_locations(db: Session = Depends(get_db)):
+def list_locations(db: Session = Depends(get_db)):
     """
     Get all unique locations with tag counts
     
@@ -197,7 +220,7 @@ async def list_locations(db: Session = Depends(get_db)):
     try:
         locations = get_all_locations(db)
         logger.info(f"Retrieved {len(locations)} locations")
-        return locations
+        return read_response(locations)
     
     except Exception as e:
         logger.error(f"Error listing locations: {str(e)}", exc_info=True)
@@ -207,7 +230,7 @@ async def list_locations(db: Session = Depends(get_db)):
         )
 
 @router.delete("/tag/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_tag_by_id(
+def delete_tag_by_id(
     tag_id: int,
     db: Session = Depends(get_db)
 ):
@@ -236,7 +259,7 @@ async def delete_tag_by_id(
         )
 
 @router.get("/statistics", response_model=Dict)
-async def get_statistics(db: Session = Depends(get_db)):
+def get_statistics(db: Session = Depends(get_db)):
     """
     Get overall statistics about tags
     
@@ -248,7 +271,7 @@ async def get_statistics(db: Session = Depends(get_db)):
     try:
         stats = get_tag_statistics(db)
         logger.info(f"Retrieved statistics: {stats}")
-        return stats
+        return read_response(stats)
     
     except Exception as e:
         logger.error(f"Error getting statistics: {str(e)}", exc_info=True)
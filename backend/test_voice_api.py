@@ -51,20 +51,6 @@ def test_long_text():
     else:
         print(f"❌ Unexpected response: {response.status_code}")
 
-def test_cleanup():
-    """Test cleanup endpoint"""
-    print("\n🧹 Testing cleanup endpoint...")
-    
-    response = requests.delete(f"{API_BASE}/voice/cleanup")
-    
-    if response.status_code == 200:
-        data = response.json()
-        print(f"✅ Cleanup successful:")
-        print(f"   Files cleaned: {data['cleaned']}")
-        print(f"   Space freed: {data['size_freed_mb']} MB")
-    else:
-        print(f"❌ Failed: {response.status_code}")
-
 def test_health():
     """Test health endpoint for TTS availability"""
     print("\n🏥 Checking TTS availability...")
@@ -124,7 +110,6 @@ if __name__ == "__main__":
         test_empty_text()
         test_long_text()
         test_multiple_requests()
-        test_cleanup()
         
         print("\n" + "=" * 60)
         print("✅ All tests completed!")